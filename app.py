@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -6,9 +7,22 @@ import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from data_validation import SCHEMAS, mask_invalid, validate
+from approximate import (APPROX_ROW_THRESHOLD, ProgressiveEstimate, approximate_summary,
+                         sample_sizes, stratified_order, stratum_labels)
+from quantile_sketch import EXACT_ROW_LIMIT, SKETCH_SEED, build_sketches, sketch_medians
+import query_engine
+from query_engine import EXPORT_ROW_LIMIT, LAZY_FILE_BYTES, PARQUET_CACHE_DIR, LazyDataset, build_parquet_cache
+from wide_features import WIDE_FEATURE_THRESHOLD, blocked_corr, plot_wide_heatmap, top_k_pairs
 import warnings
 warnings.filterwarnings('ignore')
 
+# Seconds between refreshes of approximate results while they are being refined
+APPROX_REFRESH_SECONDS = 1.0
+
+# Candidate dataset files, in the order load_data() tries them
+DATASET_FILES = [('diabetes.csv', 'diabetes'), ('heart_disease.csv', 'heart_disease')]
+
 # Set page config
 st.set_page_config(
     page_title="Healthcare Data Analysis Dashboard",
@@ -61,7 +75,38 @@ def load_data():
             st.warning("No dataset found. Please ensure 'diabetes.csv' or 'heart_disease.csv' is in the project directory.")
             return None
 
-def preprocess_data(df):
+def find_dataset_file():
+    """Return (path, dataset_type) of the first available dataset, or None"""
+    for path, dataset_type in DATASET_FILES:
+        if os.path.exists(path):
+            return path, dataset_type
+    return None
+
+def find_target_columns(columns):
+    """Candidate disease indicator columns, exact 'Outcome'/'target' names first"""
+    exact = [col for col in columns if col.lower() in ['outcome', 'target']]
+    partial = [col for col in columns if col not in exact and any(t in col.lower() for t in ['outcome', 'target', 'disease', 'diabetes', 'heart'])]
+    return exact + partial
+
+def use_lazy_engine(path):
+    """Serve large extracts (or any, with HEALTHCARE_LAZY=1) out-of-core when DuckDB is installed"""
+    if not query_engine.is_available():
+        return False
+    if os.environ.get('HEALTHCARE_LAZY') == '1':
+        return True
+    return os.path.getsize(path) > LAZY_FILE_BYTES
+
+@st.cache_resource
+def open_lazy_dataset(path, dataset_type):
+    """Build (or reuse) the cleaned Parquet cache and open it; shared by all sessions"""
+    return LazyDataset(build_parquet_cache(path, dataset_type))
+
+@st.cache_data
+def validate_dataset(_df, dataset_type, n_rows):
+    """Run the dataset type's data-quality rules once per loaded dataset"""
+    return validate(_df, SCHEMAS.get(dataset_type, []))
+
+def preprocess_data(df, report=None):
     """Clean and preprocess the dataset"""
     if df is None:
         return None
@@ -69,11 +114,17 @@ def preprocess_data(df):
     # Create a copy to avoid modifying original
     df_clean = df.copy()
     
+    # Values failing validation (e.g. a Glucose of 0) are treated as missing
+    if report is not None:
+        df_clean = mask_invalid(df_clean, report)
+    
     # Handle missing values
     if df_clean.isnull().sum().sum() > 0:
-        # For numerical columns, fill with median
+        # For numerical columns, fill with median (streaming sketch on large data)
         numerical_cols = df_clean.select_dtypes(include=[np.number]).columns
-        df_clean[numerical_cols] = df_clean[numerical_cols].fillna(df_clean[numerical_cols].median())
+        sketches = build_sketches(df_clean[numerical_cols], exact=len(df_clean) <= EXACT_ROW_LIMIT,
+                                  seed=SKETCH_SEED)
+        df_clean[numerical_cols] = df_clean[numerical_cols].fillna(sketch_medians(sketches))
         
         # For categorical columns, fill with mode
         categorical_cols = df_clean.select_dtypes(include=['object']).columns
@@ -85,7 +136,418 @@ def preprocess_data(df):
     
     return df_clean
 
-def create_summary_stats(df):
+def show_data_quality(quality):
+    """Data Quality section from a ValidationReport.summary()-style frame"""
+    st.subheader("Data Quality")
+    quality = quality[quality['Violations'] > 0]
+    if len(quality):
+        st.dataframe(quality.style.format({'Violation Rate': '{:.1%}'}), hide_index=True)
+        st.caption("Values failing these rules are treated as missing and imputed with the column median; "
+                   "rows with an invalid outcome label are dropped.")
+    else:
+        st.success("✅ All values pass the data-quality rules")
+
+def apply_filters(df, age_col=None, age_range=None, gender_col=None, selected_genders=None):
+    """Apply the sidebar age and gender filters"""
+    if age_col is not None:
+        df = df[(df[age_col] >= age_range[0]) & (df[age_col] <= age_range[1])]
+    if gender_col is not None:
+        df = df[df[gender_col].isin(selected_genders)]
+    return df
+
+@st.cache_data
+def stratified_sample_order(_df, dataset_key, target_col, age_col):
+    """Row order, built once per dataset, whose every prefix is a stratified sample"""
+    return stratified_order(stratum_labels(_df, target_col, age_col))
+
+def get_progressive_estimate(df_clean, filters, target_col):
+    """Return this session's background estimate for the current filters, restarting it when they change"""
+    key = (len(df_clean), repr(filters), target_col)
+    current = st.session_state.get('approx_estimate')
+    if current is not None and current[0] == key:
+        return current[1]
+    if current is not None:
+        current[1].cancel()
+    
+    # Stratify by the disease indicator and age bucket
+    strata_target = next((col for col in df_clean.columns if col.lower() in ['outcome', 'target']), None)
+    order = stratified_sample_order(df_clean, (df_clean['dataset_type'].iloc[0] if 'dataset_type' in df_clean.columns else None,
+                                               len(df_clean)), strata_target, filters.get('age_col'))
+    
+    def compute(size):
+        sample = apply_filters(df_clean.iloc[order[:size]], **filters)
+        return approximate_summary(sample, len(sample) * len(df_clean) / size, target_col)
+    
+    estimate = ProgressiveEstimate(compute, sample_sizes(len(df_clean))).start()
+    st.session_state['approx_estimate'] = (key, estimate)
+    return estimate
+
+def show_approx_status(estimate, size, summary):
+    """Tell the user how much data the displayed estimates are based on"""
+    if size >= estimate.sizes[-1]:
+        st.success(f"✅ Exact results from all {summary['sample_rows']:,} matching records")
+    else:
+        st.info(f"⏳ Approximate results from {summary['sample_rows']:,} sampled records "
+                f"(~{summary['population_rows']:,.0f} matching, {size / estimate.sizes[-1]:.0%} of data scanned) "
+                "- refining in the background. Error bars show 95% confidence intervals.")
+
+def render_approx_visuals(estimate, selected_cols, wide_mode, polling):
+    """Visual Insights tab answered from the stratified sample"""
+    size, summary = estimate.latest()
+    show_approx_status(estimate, size, summary)
+    
+    if selected_cols:
+        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+        axes = axes.ravel()
+        
+        for i, col in enumerate(selected_cols[:4]):
+            edges, counts, half_width = summary['histograms'][col]
+            axes[i].bar(edges[:-1], counts, width=np.diff(edges), align='edge', alpha=0.7,
+                        color='skyblue', edgecolor='black', yerr=half_width, ecolor='gray', capsize=2)
+            axes[i].set_title(f'Distribution of {col} (estimated)')
+            axes[i].set_xlabel(col)
+            axes[i].set_ylabel('Estimated Frequency')
+        
+        for i in range(len(selected_cols), len(axes)):
+            axes[i].set_visible(False)
+        
+        plt.tight_layout()
+        st.pyplot(fig)
+        plt.close(fig)
+    
+    st.subheader("Statistical Summary (estimated)")
+    st.dataframe(summary['describe'][list(selected_cols)] if selected_cols else summary['describe'])
+    
+    st.subheader("Feature Correlation Heatmap (estimated)")
+    corr_matrix = summary['corr']
+    if len(corr_matrix) > 1:
+        fig, ax = plt.subplots(figsize=(12, 8))
+        if wide_mode:
+            plot_wide_heatmap(corr_matrix, ax)
+        else:
+            sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0,
+                        square=True, ax=ax, fmt='.2f')
+            ax.set_title('Correlation Matrix of Numerical Features (estimated)')
+        st.pyplot(fig)
+        plt.close(fig)
+        half_width = ((summary['corr_high'] - summary['corr_low']) / 2).max().max()
+        if size < estimate.sizes[-1] and pd.notna(half_width):
+            st.caption(f"95% confidence intervals on correlations are at most ±{half_width:.3f}")
+    
+    st.subheader("Outlier Detection (estimated)")
+    if selected_cols:
+        fig, ax = plt.subplots(figsize=(12, 6))
+        ax.bxp(box_stats_from_describe(summary['describe'][list(selected_cols)]))
+        ax.set_title('Box Plots for Outlier Detection (estimated)')
+        ax.set_xticklabels(selected_cols, rotation=45)
+        plt.tight_layout()
+        st.pyplot(fig)
+        plt.close(fig)
+        st.caption("Quartiles are estimated from the sample; individual outlying points are not drawn.")
+    
+    if polling and estimate.done:
+        st.rerun()
+
+def render_approx_risk(estimate, target_col, polling):
+    """Risk Analysis tab answered from the stratified sample"""
+    size, summary = estimate.latest()
+    show_approx_status(estimate, size, summary)
+    
+    if 'target_corr' in summary and len(summary['target_corr']):
+        target_corr = summary['target_corr']
+        strength = target_corr['correlation'].abs()
+        positive = target_corr['correlation'] >= 0
+        low = np.where(positive, target_corr['ci_low'], -target_corr['ci_high'])
+        high = np.where(positive, target_corr['ci_high'], -target_corr['ci_low'])
+        
+        st.write("**Top Risk Factors (by correlation, estimated):**")
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.barh(range(len(strength)), strength, color='coral',
+                xerr=[strength - low, high - strength], ecolor='gray', capsize=3)
+        ax.set_yticks(range(len(strength)))
+        ax.set_yticklabels(strength.index)
+        ax.set_title('Risk Factor Correlations')
+        ax.set_xlabel('Absolute Correlation with Target')
+        plt.tight_layout()
+        st.pyplot(fig)
+        plt.close(fig)
+        
+        st.subheader("Detailed Risk Factor Analysis")
+        for factor, risk in summary['risk'].items():
+            st.write(f"**{factor} Analysis:**")
+            st.write(f"• Average {factor} for non-disease: {risk['mean_0']:.2f}")
+            st.write(f"• Average {factor} for disease: {risk['mean_1']:.2f}")
+            st.write(f"• Difference: {risk['diff']:.2f} (95% CI {risk['ci_low']:.2f} to {risk['ci_high']:.2f})")
+            if risk['ci_low'] <= 0 <= risk['ci_high'] and risk['ci_low'] < risk['ci_high']:
+                st.write("• Direction not yet clear at this sample size")
+            elif risk['diff'] > 0:
+                st.write("• Higher values increase disease risk")
+            else:
+                st.write("• Lower values increase disease risk")
+    else:
+        st.warning(f"No numerical data available to analyse {target_col}.")
+    
+    if polling and estimate.done:
+        st.rerun()
+
+def box_stats_from_describe(desc):
+    """
+    Axes.bxp() statistics from describe()-style columns
+
+    Whiskers sit at 1.5 IQR from the quartiles, clipped to the min/max, since
+    the individual points beyond them are never loaded.
+    """
+    stats = []
+    for label, column in desc.items():
+        iqr = column['75%'] - column['25%']
+        stats.append({
+            'label': label,
+            'med': column['50%'],
+            'q1': column['25%'],
+            'q3': column['75%'],
+            'whislo': max(column['min'], column['25%'] - 1.5 * iqr),
+            'whishi': min(column['max'], column['75%'] + 1.5 * iqr),
+            'fliers': [],
+        })
+    return stats
+
+def lazy_main(path, dataset_type):
+    """Dashboard backed by the lazy query engine; only query results are held in memory"""
+    dataset = open_lazy_dataset(path, dataset_type)
+    
+    # Sidebar
+    st.sidebar.header("🔧 Dashboard Controls")
+    st.sidebar.info(f"📊 Current Dataset: {dataset_type.title()}")
+    st.sidebar.caption("⚡ Out-of-core mode: filters and aggregates run in DuckDB over a Parquet cache")
+    
+    # Filter options
+    st.sidebar.subheader("📋 Data Filters")
+    filters = {}
+    
+    age_columns = [col for col in dataset.columns if 'age' in col.lower()]
+    if age_columns:
+        age_col = age_columns[0]
+        age_min, age_max = dataset.column_range(age_col)
+        age_range = st.sidebar.slider(
+            f"Select {age_col} range",
+            min_value=int(age_min),
+            max_value=int(age_max),
+            value=(int(age_min), int(age_max))
+        )
+        filters.update(age_col=age_col, age_range=age_range)
+    
+    gender_columns = [col for col in dataset.columns if any(g in col.lower() for g in ['gender', 'sex'])]
+    if gender_columns:
+        gender_col = gender_columns[0]
+        unique_genders = dataset.distinct_values(gender_col)
+        selected_genders = st.sidebar.multiselect(
+            f"Select {gender_col}",
+            options=unique_genders,
+            default=unique_genders
+        )
+        filters.update(gender_col=gender_col, selected_genders=selected_genders)
+    
+    numerical_cols = dataset.numeric_columns
+    wide_mode = st.sidebar.checkbox(
+        "Wide-feature mode",
+        value=len(numerical_cols) > WIDE_FEATURE_THRESHOLD,
+        help="Clustered, downsampled heatmap for datasets with many columns"
+    )
+    
+    target_columns = find_target_columns(dataset.columns)
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["📊 Dataset Overview", "📈 Visual Insights", "🔍 Risk Analysis", "📋 Data Explorer"])
+    
+    with tab1:
+        st.header("Dataset Overview")
+        
+        stats = dataset.summary_stats(filters)
+        rules = SCHEMAS.get(dataset_type, [])
+        quality = dataset.validation_summary(filters, rules)
+        col1, col2, col3, col4, col5 = st.columns(5)
+        
+        with col1:
+            st.metric("Total Records", stats['Total Records'])
+        with col2:
+            st.metric("Total Features", stats['Total Features'])
+        with col3:
+            st.metric("Missing Values", stats['Missing Values'])
+        with col4:
+            st.metric("Invalid Values", int(quality['Violations'].sum()))
+        with col5:
+            st.metric("Data Size", stats['Data Size'])
+        
+        if rules:
+            show_data_quality(quality)
+        
+        st.subheader("Dataset Information")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.write("**First 5 rows:**")
+            st.dataframe(dataset.fetch(filters, limit=5))
+        
+        with col2:
+            st.write("**Dataset Info:**")
+            st.dataframe(dataset.column_info(filters).astype(str))
+        
+        st.subheader("Statistical Summary")
+        st.dataframe(dataset.describe(filters))
+    
+    with tab2:
+        st.header("Visual Insights")
+        
+        st.subheader("Feature Distributions")
+        selected_cols = st.multiselect(
+            "Select features to visualize:",
+            options=numerical_cols,
+            default=numerical_cols[:4]
+        )
+        
+        if selected_cols:
+            fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+            axes = axes.ravel()
+            
+            for i, col in enumerate(selected_cols[:4]):
+                edges, counts = dataset.histogram(filters, col, bins=30)
+                axes[i].bar(edges[:-1], counts, width=np.diff(edges), align='edge', alpha=0.7,
+                            color='skyblue', edgecolor='black')
+                axes[i].set_title(f'Distribution of {col}')
+                axes[i].set_xlabel(col)
+                axes[i].set_ylabel('Frequency')
+            
+            for i in range(len(selected_cols), len(axes)):
+                axes[i].set_visible(False)
+            
+            plt.tight_layout()
+            st.pyplot(fig)
+        
+        st.subheader("Feature Correlation Heatmap")
+        corr_matrix = None
+        if len(numerical_cols) > 1:
+            corr_matrix = dataset.corr(filters, numerical_cols)
+            
+            fig, ax = plt.subplots(figsize=(12, 10 if wide_mode else 8))
+            if wide_mode:
+                plot_wide_heatmap(corr_matrix, ax)
+            else:
+                sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0,
+                            square=True, ax=ax, fmt='.2f')
+                ax.set_title('Correlation Matrix of Numerical Features')
+            st.pyplot(fig)
+            
+            if wide_mode:
+                st.write("**Top 10 Feature Correlations:**")
+                st.dataframe(pd.DataFrame(top_k_pairs(corr_matrix, k=10),
+                                          columns=['Feature 1', 'Feature 2', 'Absolute Correlation']))
+        
+        st.subheader("Outlier Detection")
+        if selected_cols:
+            fig, ax = plt.subplots(figsize=(12, 6))
+            ax.bxp(box_stats_from_describe(dataset.describe(filters, selected_cols)))
+            ax.set_title('Box Plots for Outlier Detection')
+            ax.set_xticklabels(selected_cols, rotation=45)
+            plt.tight_layout()
+            st.pyplot(fig)
+    
+    with tab3:
+        st.header("Risk Factor Analysis")
+        
+        if target_columns:
+            target_col = target_columns[0]
+            st.subheader(f"Analysis of {target_col}")
+            
+            risk_factors = [col for col in numerical_cols if col != target_col]
+            
+            if risk_factors:
+                # Reuse the heatmap's matrix; otherwise only the p correlations with the target are needed
+                if corr_matrix is not None and target_col in corr_matrix.columns:
+                    correlations = corr_matrix.loc[risk_factors, target_col]
+                else:
+                    correlations = dataset.corr_with(filters, risk_factors, target_col)
+                correlations = correlations.abs().sort_values(ascending=False)
+                
+                st.write("**Top Risk Factors (by correlation):**")
+                fig, ax = plt.subplots(figsize=(10, 6))
+                plotted = correlations.head(WIDE_FEATURE_THRESHOLD) if wide_mode else correlations
+                plotted.plot(kind='barh', ax=ax, color='coral')
+                ax.set_title('Risk Factor Correlations')
+                ax.set_xlabel('Absolute Correlation with Target')
+                plt.tight_layout()
+                st.pyplot(fig)
+                
+                st.subheader("Detailed Risk Factor Analysis")
+                
+                for factor in correlations.head(3).index:
+                    st.write(f"**{factor} Analysis:**")
+                    stats_by_target = dataset.group_describe(filters, target_col, factor)
+                    
+                    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
+                    
+                    edges, counts_by_target = dataset.histogram(filters, factor, bins=20, by=target_col)
+                    for target_val in counts_by_target.columns:
+                        ax1.bar(edges[:-1], counts_by_target[target_val], width=np.diff(edges), align='edge',
+                                alpha=0.7, label=f'Target = {target_val}')
+                    ax1.set_title(f'{factor} Distribution by Target')
+                    ax1.set_xlabel(factor)
+                    ax1.set_ylabel('Frequency')
+                    ax1.legend()
+                    
+                    ax2.bxp(box_stats_from_describe(stats_by_target.T))
+                    ax2.set_title(f'{factor} by Target')
+                    ax2.set_xlabel('Target')
+                    ax2.set_ylabel(factor)
+                    
+                    plt.tight_layout()
+                    st.pyplot(fig)
+                    
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.write("**Statistics by Target:**")
+                        st.dataframe(stats_by_target)
+                    
+                    with col2:
+                        st.write("**Risk Insights:**")
+                        mean_0 = stats_by_target['mean'].get(0, np.nan)
+                        mean_1 = stats_by_target['mean'].get(1, np.nan)
+                        diff = mean_1 - mean_0
+                        st.write(f"• Average {factor} for non-disease: {mean_0:.2f}")
+                        st.write(f"• Average {factor} for disease: {mean_1:.2f}")
+                        st.write(f"• Difference: {diff:.2f}")
+                        if diff > 0:
+                            st.write("• Higher values increase disease risk")
+                        else:
+                            st.write("• Lower values increase disease risk")
+        
+        else:
+            st.warning("No target variable found for risk analysis. Please ensure your dataset has a column indicating disease presence.")
+    
+    with tab4:
+        st.header("Data Explorer")
+        
+        st.subheader("Interactive Data Table")
+        
+        search_term = st.text_input("Search in data:", "")
+        matching = dataset.count(filters, search_term)
+        display_df = dataset.fetch(filters, search_term=search_term)
+        if matching > len(display_df):
+            st.caption(f"Showing the first {len(display_df):,} of {matching:,} matching records")
+        
+        st.dataframe(display_df, use_container_width=True)
+        
+        # The export is written by the engine only on request, not on every rerun
+        if st.button("Prepare filtered data for download"):
+            if matching > EXPORT_ROW_LIMIT:
+                st.caption(f"The export holds the first {EXPORT_ROW_LIMIT:,} of {matching:,} matching records; "
+                           f"narrow the filters or query the Parquet cache in {PARQUET_CACHE_DIR}/ for the rest")
+            st.download_button(
+                label="Download filtered data as CSV",
+                data=dataset.export_csv(filters, search_term=search_term),
+                file_name=f"healthcare_data_filtered_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv"
+            )
+
+def create_summary_stats(df, report=None):
     """Create summary statistics"""
     if df is None:
         return None
@@ -97,12 +559,21 @@ def create_summary_stats(df):
         'Duplicate Records': df.duplicated().sum(),
         'Memory Usage': f"{df.memory_usage(deep=True).sum() / 1024**2:.2f} MB"
     }
+    if report is not None:
+        # df keeps the row labels of the validated frame, so they index the row bitmaps
+        stats['Invalid Values'] = sum(report.counts_for_rows(df.index.to_numpy()).values())
     return stats
 
 def main():
     st.markdown('<h1 class="main-header">🏥 Healthcare Data Analysis Dashboard</h1>', unsafe_allow_html=True)
     st.markdown("### Understanding Disease Risk Factors through Data Analysis")
     
+    # Large extracts are queried out-of-core instead of loaded into memory
+    source = find_dataset_file()
+    if source is not None and use_lazy_engine(source[0]):
+        lazy_main(*source)
+        return
+    
     # Load data
     df = load_data()
     
@@ -110,8 +581,9 @@ def main():
         st.error("Please add a healthcare dataset (diabetes.csv or heart_disease.csv) to the project directory.")
         return
     
-    # Preprocess data
-    df_clean = preprocess_data(df)
+    # Validate and preprocess data
+    report = validate_dataset(df, df['dataset_type'].iloc[0] if 'dataset_type' in df.columns else None, len(df))
+    df_clean = preprocess_data(df, report)
     
     # Sidebar
     st.sidebar.header("🔧 Dashboard Controls")
@@ -124,6 +596,8 @@ def main():
     # Filter options
     st.sidebar.subheader("📋 Data Filters")
     
+    filters = {}
+    
     # Age filter (if age column exists)
     age_columns = [col for col in df_clean.columns if 'age' in col.lower()]
     if age_columns:
@@ -134,9 +608,7 @@ def main():
             max_value=int(df_clean[age_col].max()),
             value=(int(df_clean[age_col].min()), int(df_clean[age_col].max()))
         )
-        df_filtered = df_clean[(df_clean[age_col] >= age_range[0]) & (df_clean[age_col] <= age_range[1])]
-    else:
-        df_filtered = df_clean
+        filters.update(age_col=age_col, age_range=age_range)
     
     # Gender filter (if gender column exists)
     gender_columns = [col for col in df_clean.columns if any(g in col.lower() for g in ['gender', 'sex'])]
@@ -148,7 +620,31 @@ def main():
             options=unique_genders,
             default=unique_genders
         )
-        df_filtered = df_filtered[df_filtered[gender_col].isin(selected_genders)]
+        filters.update(gender_col=gender_col, selected_genders=selected_genders)
+    
+    df_filtered = apply_filters(df_clean, **filters)
+    
+    # Wide-feature mode for extracts with many numerical columns
+    n_numerical = len(df_clean.select_dtypes(include=[np.number]).columns)
+    wide_mode = st.sidebar.checkbox(
+        "Wide-feature mode",
+        value=n_numerical > WIDE_FEATURE_THRESHOLD,
+        help="Blocked float32 correlations and a clustered, downsampled heatmap for datasets with many columns"
+    )
+    
+    # Approximate mode answers the insight and risk tabs from a stratified sample
+    approx_mode = st.sidebar.checkbox(
+        "Approximate mode",
+        value=len(df_clean) > APPROX_ROW_THRESHOLD,
+        help="Fast estimates with confidence intervals, refined toward the exact answer in the background"
+    )
+    
+    # Find target variable (disease indicator)
+    target_columns = find_target_columns(df_filtered.columns)
+    
+    if approx_mode:
+        estimate = get_progressive_estimate(df_clean, filters, target_columns[0] if target_columns else None)
+        refresh = None if estimate.done else APPROX_REFRESH_SECONDS
     
     # Main content
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Dataset Overview", "📈 Visual Insights", "🔍 Risk Analysis", "📋 Data Explorer"])
@@ -157,8 +653,8 @@ def main():
         st.header("Dataset Overview")
         
         # Summary statistics
-        stats = create_summary_stats(df_filtered)
-        col1, col2, col3, col4 = st.columns(4)
+        stats = create_summary_stats(df_filtered, report)
+        col1, col2, col3, col4, col5 = st.columns(5)
         
         with col1:
             st.metric("Total Records", stats['Total Records'])
@@ -167,8 +663,14 @@ def main():
         with col3:
             st.metric("Missing Values", stats['Missing Values'])
         with col4:
+            st.metric("Invalid Values", stats['Invalid Values'])
+        with col5:
             st.metric("Memory Usage", stats['Memory Usage'])
         
+        # Data quality
+        if report.rules:
+            show_data_quality(report.summary(df_filtered.index.to_numpy()))
+        
         # Dataset info
         st.subheader("Dataset Information")
         col1, col2 = st.columns(2)
@@ -212,53 +714,68 @@ def main():
             default=numerical_cols[:4] if len(numerical_cols) >= 4 else numerical_cols
         )
         
-        if selected_cols:
-            # Create subplots
-            fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-            axes = axes.ravel()
-            
-            for i, col in enumerate(selected_cols[:4]):
-                if i < len(axes):
-                    axes[i].hist(df_filtered[col].dropna(), bins=30, alpha=0.7, color='skyblue', edgecolor='black')
-                    axes[i].set_title(f'Distribution of {col}')
-                    axes[i].set_xlabel(col)
-                    axes[i].set_ylabel('Frequency')
-            
-            # Hide unused subplots
-            for i in range(len(selected_cols), len(axes)):
-                axes[i].set_visible(False)
+        if approx_mode:
+            st.fragment(run_every=refresh)(render_approx_visuals)(estimate, selected_cols, wide_mode, refresh is not None)
+        else:
+            if selected_cols:
+                # Create subplots
+                fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+                axes = axes.ravel()
+                
+                for i, col in enumerate(selected_cols[:4]):
+                    if i < len(axes):
+                        axes[i].hist(df_filtered[col].dropna(), bins=30, alpha=0.7, color='skyblue', edgecolor='black')
+                        axes[i].set_title(f'Distribution of {col}')
+                        axes[i].set_xlabel(col)
+                        axes[i].set_ylabel('Frequency')
+                
+                # Hide unused subplots
+                for i in range(len(selected_cols), len(axes)):
+                    axes[i].set_visible(False)
+                
+                plt.tight_layout()
+                st.pyplot(fig)
             
-            plt.tight_layout()
-            st.pyplot(fig)
-        
-        # Correlation heatmap
-        st.subheader("Feature Correlation Heatmap")
-        if len(numerical_cols) > 1:
-            corr_matrix = df_filtered[numerical_cols].corr()
+            # Correlation heatmap
+            st.subheader("Feature Correlation Heatmap")
+            if len(numerical_cols) > 1 and wide_mode:
+                corr_matrix = blocked_corr(df_filtered[numerical_cols])
+                
+                fig, ax = plt.subplots(figsize=(12, 10))
+                plot_wide_heatmap(corr_matrix, ax)
+                st.pyplot(fig)
+                
+                st.write("**Top 10 Feature Correlations:**")
+                st.dataframe(pd.DataFrame(top_k_pairs(corr_matrix, k=10),
+                                          columns=['Feature 1', 'Feature 2', 'Absolute Correlation']))
+            elif len(numerical_cols) > 1:
+                corr_matrix = df_filtered[numerical_cols].corr()
+                
+                fig, ax = plt.subplots(figsize=(12, 8))
+                sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, 
+                           square=True, ax=ax, fmt='.2f')
+                ax.set_title('Correlation Matrix of Numerical Features')
+                st.pyplot(fig)
             
-            fig, ax = plt.subplots(figsize=(12, 8))
-            sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, 
-                       square=True, ax=ax, fmt='.2f')
-            ax.set_title('Correlation Matrix of Numerical Features')
-            st.pyplot(fig)
-        
-        # Box plots for outlier detection
-        st.subheader("Outlier Detection")
-        if selected_cols:
-            fig, ax = plt.subplots(figsize=(12, 6))
-            df_filtered[selected_cols].boxplot(ax=ax)
-            ax.set_title('Box Plots for Outlier Detection')
-            ax.set_xticklabels(selected_cols, rotation=45)
-            plt.tight_layout()
-            st.pyplot(fig)
+            # Box plots for outlier detection
+            st.subheader("Outlier Detection")
+            if selected_cols:
+                fig, ax = plt.subplots(figsize=(12, 6))
+                df_filtered[selected_cols].boxplot(ax=ax)
+                ax.set_title('Box Plots for Outlier Detection')
+                ax.set_xticklabels(selected_cols, rotation=45)
+                plt.tight_layout()
+                st.pyplot(fig)
     
     with tab3:
         st.header("Risk Factor Analysis")
         
-        # Find target variable (disease indicator)
-        target_columns = [col for col in df_filtered.columns if any(t in col.lower() for t in ['outcome', 'target', 'disease', 'diabetes', 'heart'])]
+        if target_columns and approx_mode:
+            target_col = target_columns[0]
+            st.subheader(f"Analysis of {target_col}")
+            st.fragment(run_every=refresh)(render_approx_risk)(estimate, target_col, refresh is not None)
         
-        if target_columns:
+        elif target_columns:
             target_col = target_columns[0]
             st.subheader(f"Analysis of {target_col}")
             
@@ -268,11 +785,13 @@ def main():
             
             if risk_factors:
                 # Calculate correlation with target
-                correlations = df_filtered[risk_factors + [target_col]].corr()[target_col].drop(target_col).abs().sort_values(ascending=False)
+                # Only the p correlations with the target are needed, not the p x p matrix
+                correlations = df_filtered[risk_factors].corrwith(df_filtered[target_col]).abs().sort_values(ascending=False)
                 
                 st.write("**Top Risk Factors (by correlation):**")
                 fig, ax = plt.subplots(figsize=(10, 6))
-                correlations.plot(kind='barh', ax=ax, color='coral')
+                plotted = correlations.head(WIDE_FEATURE_THRESHOLD) if wide_mode else correlations
+                plotted.plot(kind='barh', ax=ax, color='coral')
                 ax.set_title('Risk Factor Correlations')
                 ax.set_xlabel('Absolute Correlation with Target')
                 plt.tight_layout()
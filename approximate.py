@@ -0,0 +1,207 @@
+"""
+Healthcare Data Analysis - Approximate Exploration
+Stratified samples, confidence intervals and background refinement for large datasets
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Datasets with more rows than this open in approximate mode by default
+APPROX_ROW_THRESHOLD = 200_000
+
+# Rows in the first (fastest) sample; each refinement step grows it by SAMPLE_GROWTH
+DEFAULT_SAMPLE_SIZE = 10_000
+SAMPLE_GROWTH = 4
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959964
+
+
+def stratum_labels(df, target_col=None, age_col=None, age_buckets=5):
+    """Integer stratum per row from the target value and an age quantile bucket"""
+    keys = []
+    if target_col is not None:
+        keys.append(df[target_col])
+    if age_col is not None:
+        keys.append(pd.qcut(df[age_col], q=age_buckets, labels=False, duplicates='drop'))
+    if not keys:
+        return np.zeros(len(df), dtype=np.int64)
+    return pd.concat(keys, axis=1, ignore_index=True).groupby(list(range(len(keys))), dropna=False).ngroup().to_numpy()
+
+
+def stratified_order(strata, seed=42):
+    """
+    Row positions ordered so that every prefix is a proportional stratified sample
+
+    Rows are shuffled, then sorted by their fractional position within their own
+    stratum; the first m positions therefore contain about m * share rows from
+    each stratum, and growing the sample only ever appends rows.
+    """
+    rng = np.random.default_rng(seed)
+    codes = np.asarray(strata)
+    shuffled = rng.permutation(len(codes))
+    shuffled_codes = codes[shuffled]
+    within = pd.Series(shuffled_codes).groupby(shuffled_codes).cumcount().to_numpy()
+    sizes = np.bincount(shuffled_codes)
+    fraction = (within + rng.random(len(codes))) / sizes[shuffled_codes]
+    return shuffled[np.argsort(fraction, kind='stable')]
+
+
+def sample_sizes(n_rows, base=DEFAULT_SAMPLE_SIZE, growth=SAMPLE_GROWTH):
+    """Increasing prefix sizes ending at the full dataset"""
+    sizes = []
+    size = base
+    while size < n_rows:
+        sizes.append(size)
+        size *= growth
+    sizes.append(n_rows)
+    return sizes
+
+
+def _fpc(n, population_size):
+    """Finite population correction for a sample of n out of population_size"""
+    if population_size <= 1 or n >= population_size:
+        return 0.0
+    return np.sqrt((population_size - n) / (population_size - 1))
+
+
+def describe_with_ci(sample, population_size):
+    """sample.describe() with an estimated population count and 95% CI on the mean"""
+    desc = sample.describe()
+    counts = sample.count()
+    se = sample.std() / np.sqrt(counts) * _fpc(len(sample), population_size)
+    desc.loc['count'] = counts * population_size / max(len(sample), 1)
+    desc.loc['mean 95% CI low'] = desc.loc['mean'] - Z_95 * se
+    desc.loc['mean 95% CI high'] = desc.loc['mean'] + Z_95 * se
+    return desc
+
+
+def histogram_with_ci(values, population_size, bins=30):
+    """Estimated population histogram: (edges, counts, 95% CI half-widths)"""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+    if n == 0:
+        return edges, counts.astype(np.float64), np.zeros(len(counts))
+    share = counts / n
+    half_width = Z_95 * np.sqrt(share * (1 - share) / n) * _fpc(n, population_size) * population_size
+    return edges, share * population_size, half_width
+
+
+def corr_with_ci(sample, population_size=None):
+    """
+    Correlation matrix with Fisher-z 95% CI bounds: (corr, low, high)
+
+    The interval shrinks with the finite population correction and has zero
+    width once the sample is the whole population.
+    """
+    corr = sample.corr()
+    n = len(sample)
+    fpc = 1.0 if population_size is None else _fpc(n, population_size)
+    if fpc == 0:
+        return corr, corr.copy(), corr.copy()
+    if n <= 3:
+        return corr, corr * np.nan, corr * np.nan
+    z = np.arctanh(corr.clip(-0.999999, 0.999999))
+    half_width = Z_95 / np.sqrt(n - 3) * fpc
+    return corr, np.tanh(z - half_width), np.tanh(z + half_width)
+
+
+def mean_diff_ci(sample, factor, target_col, population_size):
+    """mean_1 - mean_0 for a risk factor with a Welch 95% CI"""
+    group_0 = sample.loc[sample[target_col] == 0, factor].dropna()
+    group_1 = sample.loc[sample[target_col] == 1, factor].dropna()
+    mean_0, mean_1 = group_0.mean(), group_1.mean()
+    diff = mean_1 - mean_0
+    se = np.sqrt(group_0.var() / max(len(group_0), 1) + group_1.var() / max(len(group_1), 1))
+    se *= _fpc(len(sample), population_size)
+    return {
+        'mean_0': mean_0,
+        'mean_1': mean_1,
+        'diff': diff,
+        'ci_low': diff - Z_95 * se,
+        'ci_high': diff + Z_95 * se,
+    }
+
+
+def approximate_summary(sample, population_size, target_col=None, bins=30, top_factors=3):
+    """
+    Everything the Visual Insights and Risk Analysis tabs need, estimated from a sample
+
+    `population_size` is the (estimated) number of rows the sample stands for.
+    """
+    numerical = sample.select_dtypes(include=[np.number])
+    summary = {
+        'sample_rows': len(sample),
+        'population_rows': population_size,
+        'describe': describe_with_ci(numerical, population_size),
+        'histograms': {col: histogram_with_ci(numerical[col].to_numpy(), population_size, bins=bins)
+                       for col in numerical.columns},
+    }
+    summary['corr'], summary['corr_low'], summary['corr_high'] = corr_with_ci(numerical, population_size)
+
+    if target_col is not None and target_col in numerical.columns:
+        target_corr = summary['corr'][target_col].drop(target_col)
+        order = target_corr.abs().sort_values(ascending=False).index
+        summary['target_corr'] = pd.DataFrame({
+            'correlation': target_corr[order],
+            'ci_low': summary['corr_low'][target_col][order],
+            'ci_high': summary['corr_high'][target_col][order],
+        })
+        summary['risk'] = {factor: mean_diff_ci(sample, factor, target_col, population_size)
+                           for factor in order[:top_factors]}
+    return summary
+
+
+class ProgressiveEstimate:
+    """
+    Recompute an estimate on successively larger samples in a background thread
+
+    `compute(size)` is called for each entry of `sizes`; the first one runs
+    synchronously so a result is always available, the rest run on a daemon
+    thread. latest() returns the most refined (size, result) so far.
+    """
+
+    def __init__(self, compute, sizes):
+        self._compute = compute
+        self.sizes = list(sizes)
+        self._results = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread = None
+        self.error = None
+
+    def start(self):
+        self._results.append((self.sizes[0], self._compute(self.sizes[0])))
+        if len(self.sizes) > 1:
+            self._thread = threading.Thread(target=self._refine, daemon=True)
+            self._thread.start()
+        return self
+
+    def _refine(self):
+        for size in self.sizes[1:]:
+            if self._cancelled.is_set():
+                return
+            try:
+                result = self._compute(size)
+            except Exception as e:
+                # Keep the last good estimate; stop refining
+                with self._lock:
+                    self.error = e
+                return
+            with self._lock:
+                self._results.append((size, result))
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def latest(self):
+        with self._lock:
+            return self._results[-1]
+
+    @property
+    def done(self):
+        with self._lock:
+            return self.error is not None or len(self._results) == len(self.sizes)
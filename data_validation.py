@@ -0,0 +1,272 @@
+"""
+Healthcare Data Analysis - Data Quality Validation
+Declarative per-schema rules evaluated in one vectorized pass over column arrays or chunks
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Working memory for one chunk of validate_csv(); its row bitmaps spill to disk (see validate_csv)
+DEFAULT_MEMORY_BUDGET = 256 * 1024**2
+
+# Outcome labels are never imputed; mask_invalid() drops rows whose label fails a rule
+LABEL_COLUMNS = ['Outcome', 'target']
+
+
+class Rule:
+    """
+    A single data-quality rule on one column
+
+    kind is one of:
+      'zero_as_missing' - a 0 encodes a missing measurement
+      'range'           - values must lie within [low, high]
+      'domain'          - values must be one of `allowed`
+    Missing values never violate 'range' or 'domain' rules, and neither do
+    values already flagged by the column's 'zero_as_missing' rule.
+    """
+
+    def __init__(self, kind, column, low=None, high=None, allowed=None):
+        self.kind = kind
+        self.column = column
+        self.low = low
+        self.high = high
+        self.allowed = None if allowed is None else np.asarray(sorted(allowed), dtype=np.float64)
+
+    @property
+    def name(self):
+        if self.kind == 'range':
+            return f'{self.column} in [{self.low:g}, {self.high:g}]'
+        if self.kind == 'domain':
+            return f"{self.column} in {{{', '.join(f'{v:g}' for v in self.allowed)}}}"
+        return f'{self.column} zero as missing'
+
+    def violations(self, values, missing):
+        """Boolean violation mask for a float64 array; `missing` marks values to skip"""
+        if self.kind == 'zero_as_missing':
+            return values == 0
+        if self.kind == 'range':
+            return ~missing & ((values < self.low) | (values > self.high))
+        if self.kind == 'domain':
+            return ~missing & ~np.isin(values, self.allowed)
+        raise ValueError(f"Unknown rule kind: {self.kind}")
+
+
+def zero_as_missing(column):
+    return Rule('zero_as_missing', column)
+
+
+def value_range(column, low, high):
+    return Rule('range', column, low=low, high=high)
+
+
+def allowed_values(column, values):
+    return Rule('domain', column, allowed=values)
+
+
+# Physiological plausibility rules per dataset type
+SCHEMAS = {
+    'diabetes': [
+        *(zero_as_missing(col) for col in ['Glucose', 'BloodPressure', 'SkinThickness', 'Insulin', 'BMI']),
+        value_range('Pregnancies', 0, 25),
+        value_range('Glucose', 40, 400),             # 2-hour OGTT plasma glucose, mg/dL
+        value_range('BloodPressure', 30, 150),       # diastolic, mm Hg
+        value_range('SkinThickness', 3, 100),        # triceps skinfold, mm
+        value_range('Insulin', 5, 1000),             # 2-hour serum insulin, mu U/ml
+        value_range('BMI', 12, 80),
+        value_range('DiabetesPedigreeFunction', 0, 3),
+        value_range('Age', 18, 120),
+        allowed_values('Outcome', [0, 1]),
+    ],
+    'heart_disease': [
+        value_range('age', 18, 120),
+        allowed_values('sex', [0, 1]),
+        allowed_values('cp', [1, 2, 3, 4]),
+        value_range('trestbps', 70, 250),            # resting blood pressure, mm Hg
+        value_range('chol', 80, 700),                # serum cholesterol, mg/dL
+        allowed_values('fbs', [0, 1]),
+        allowed_values('restecg', [0, 1, 2]),
+        value_range('thalach', 50, 250),             # maximum heart rate
+        allowed_values('exang', [0, 1]),
+        value_range('oldpeak', -3, 10),              # ST depression
+        allowed_values('slope', [1, 2, 3]),
+        allowed_values('ca', [0, 1, 2, 3]),
+        allowed_values('thal', [3, 6, 7]),
+        allowed_values('target', [0, 1, 2, 3, 4]),
+    ],
+}
+
+
+class ValidationReport:
+    """
+    Per-rule violation counts and row bitmaps
+
+    Bitmaps are bit-packed (one bit per row per rule) and kept in memory, or
+    appended to one file per rule under `bitmap_dir` so memory stays fixed
+    however many rows are validated. With bitmaps=False only the counts are
+    kept. Row positions are 0-based positions in the validated stream.
+    """
+
+    def __init__(self, rules, bitmap_dir=None, bitmaps=True):
+        self.rules = rules
+        self.n_rows = 0
+        self.counts = {rule.name: 0 for rule in rules}
+        self.bitmaps = bitmaps
+        self.bitmap_dir = bitmap_dir if bitmaps else None
+        # Set by validate_csv() when the bitmaps spill to a temporary directory
+        self.temp_dir = None
+        self._packed = {rule.name: [] for rule in rules}
+        self._pending = {rule.name: np.zeros(0, dtype=bool) for rule in rules}
+        if self.bitmap_dir is not None:
+            os.makedirs(bitmap_dir, exist_ok=True)
+            for i in range(len(rules)):
+                open(self._bitmap_path(i), 'wb').close()
+
+    def _bitmap_path(self, i):
+        return os.path.join(self.bitmap_dir, f'rule_{i:03d}.bits')
+
+    def _append(self, i, rule, mask):
+        # Pack whole bytes only; carry the remaining bits to the next chunk
+        bits = np.concatenate([self._pending[rule.name], mask])
+        whole = len(bits) - len(bits) % 8
+        packed = np.packbits(bits[:whole])
+        self._pending[rule.name] = bits[whole:]
+        if self.bitmap_dir is None:
+            self._packed[rule.name].append(packed)
+        else:
+            with open(self._bitmap_path(i), 'ab') as f:
+                f.write(packed.tobytes())
+
+    def add_chunk(self, chunk):
+        """Evaluate every rule on one DataFrame chunk"""
+        by_column = {}
+        for i, rule in enumerate(self.rules):
+            by_column.setdefault(rule.column, []).append((i, rule))
+
+        for column, rules in by_column.items():
+            if column in chunk.columns:
+                values = pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                values = np.full(len(chunk), np.nan)
+            missing = np.isnan(values)
+            # Zero-as-missing rules run first so range/domain rules skip those zeros
+            rules = sorted(rules, key=lambda item: item[1].kind != 'zero_as_missing')
+            for i, rule in rules:
+                mask = rule.violations(values, missing)
+                if rule.kind == 'zero_as_missing':
+                    missing = missing | mask
+                self.counts[rule.name] += int(mask.sum())
+                if self.bitmaps:
+                    self._append(i, rule, mask)
+
+        self.n_rows += len(chunk)
+        return self
+
+    def bitmap(self, rule_name):
+        """Boolean violation mask over all validated rows for one rule"""
+        if not self.bitmaps:
+            raise ValueError("Report was built with bitmaps=False and only holds counts")
+        i = next(i for i, rule in enumerate(self.rules) if rule.name == rule_name)
+        if self.bitmap_dir is None:
+            packed = np.concatenate(self._packed[rule_name] or [np.zeros(0, dtype=np.uint8)])
+        else:
+            packed = np.fromfile(self._bitmap_path(i), dtype=np.uint8)
+        return np.concatenate([np.unpackbits(packed), self._pending[rule_name]])[:self.n_rows].astype(bool)
+
+    def invalid_mask(self, column):
+        """Rows where any rule on `column` is violated"""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for rule in self.rules:
+            if rule.column == column:
+                mask |= self.bitmap(rule.name)
+        return mask
+
+    def counts_for_rows(self, positions):
+        """Per-rule violation counts restricted to the given row positions"""
+        positions = np.asarray(positions)
+        return {rule.name: int(self.bitmap(rule.name)[positions].sum()) for rule in self.rules}
+
+    def summary(self, positions=None):
+        """DataFrame of violations per rule, optionally restricted to row positions"""
+        counts = self.counts if positions is None else self.counts_for_rows(positions)
+        n_rows = self.n_rows if positions is None else len(positions)
+        return pd.DataFrame({
+            'Rule': [rule.name for rule in self.rules],
+            'Column': [rule.column for rule in self.rules],
+            'Violations': [counts[rule.name] for rule in self.rules],
+            'Violation Rate': [counts[rule.name] / n_rows if n_rows else 0.0 for rule in self.rules],
+        })
+
+    @property
+    def total_violations(self):
+        return sum(self.counts.values())
+
+
+def chunk_rows_for_budget(n_columns, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Rows per chunk so one parsed chunk plus its masks fits in the memory budget"""
+    # Parsed float64 values, a float64 working copy and boolean masks per column
+    bytes_per_row = max(n_columns, 1) * (8 + 8 + 2)
+    rows = memory_budget // bytes_per_row
+    return max(8192, rows - rows % 8)
+
+
+def validate(data, rules, chunksize=None, bitmap_dir=None, bitmaps=True):
+    """
+    Validate a DataFrame or an iterable of DataFrame chunks against `rules`
+
+    A DataFrame is processed in chunks of `chunksize` rows when given.
+    """
+    report = ValidationReport(rules, bitmap_dir=bitmap_dir, bitmaps=bitmaps)
+    if isinstance(data, pd.DataFrame):
+        if chunksize is None:
+            return report.add_chunk(data)
+        frame = data
+        data = (frame.iloc[start:start + chunksize] for start in range(0, len(frame), chunksize))
+    for chunk in data:
+        report.add_chunk(chunk)
+    return report
+
+
+def validate_csv(path, rules, memory_budget=DEFAULT_MEMORY_BUDGET, bitmap_dir=None, bitmaps=True):
+    """
+    Stream a CSV through the rules within a fixed memory budget
+
+    Bitmaps go to `bitmap_dir`, or to a temporary directory that is removed
+    with the report, so memory does not grow with the row count. Pass
+    bitmaps=False when only the counts are needed.
+    """
+    columns = sorted({rule.column for rule in rules})
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [col for col in columns if col in header]
+    chunksize = chunk_rows_for_budget(len(usecols), memory_budget)
+    reader = pd.read_csv(path, usecols=usecols, chunksize=chunksize, na_values='?')
+    temp_dir = None
+    if bitmaps and bitmap_dir is None:
+        temp_dir = tempfile.TemporaryDirectory(prefix='validation_')
+        bitmap_dir = temp_dir.name
+    report = validate(reader, rules, bitmap_dir=bitmap_dir, bitmaps=bitmaps)
+    report.temp_dir = temp_dir
+    return report
+
+
+def mask_invalid(df, report):
+    """
+    Replace values flagged by the report with NaN; `df` must be the frame that was validated
+
+    Rows with an invalid label in LABEL_COLUMNS are dropped instead, since an
+    imputed outcome would be made up. Index labels are kept, so row positions
+    of the validated frame still index the report's bitmaps.
+    """
+    df = df.copy()
+    drop = np.zeros(len(df), dtype=bool)
+    for column in {rule.column for rule in report.rules}:
+        if column not in df.columns:
+            continue
+        invalid = report.invalid_mask(column)
+        if column in LABEL_COLUMNS:
+            drop |= invalid
+        elif invalid.any():
+            df[column] = df[column].mask(invalid)
+    return df[~drop] if drop.any() else df
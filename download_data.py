@@ -9,6 +9,8 @@ import requests
 import io
 import os
 
+from data_validation import SCHEMAS, validate_csv
+
 def download_diabetes_data():
     """Download diabetes dataset from UCI ML Repository"""
     print("📥 Downloading diabetes dataset...")
@@ -37,16 +39,8 @@ def download_heart_disease_data():
     
     try:
         response = requests.get(url)
-        df = pd.read_csv(io.StringIO(response.text), names=columns)
-        
-        # Clean the data - replace '?' with NaN
-        df = df.replace('?', np.nan)
-        
-        # Convert numeric columns
-        numeric_columns = ['age', 'trestbps', 'chol', 'fbs', 'restecg', 
-                          'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'target']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        # '?' marks missing values; parsing them as NaN keeps every column numeric
+        df = pd.read_csv(io.StringIO(response.text), names=columns, na_values='?')
         
         df.to_csv('heart_disease.csv', index=False)
         print(f"✅ Heart disease dataset downloaded successfully! Shape: {df.shape}")
@@ -104,9 +98,13 @@ if __name__ == "__main__":
     if os.path.exists('diabetes.csv'):
         df = pd.read_csv('diabetes.csv')
         print(f"• diabetes.csv: {df.shape[0]} records, {df.shape[1]} features")
+        report = validate_csv('diabetes.csv', SCHEMAS['diabetes'], bitmaps=False)
+        print(f"  {report.total_violations} values fail data-quality rules (treated as missing during analysis)")
     
     if os.path.exists('heart_disease.csv'):
         df = pd.read_csv('heart_disease.csv')
         print(f"• heart_disease.csv: {df.shape[0]} records, {df.shape[1]} features")
+        report = validate_csv('heart_disease.csv', SCHEMAS['heart_disease'], bitmaps=False)
+        print(f"  {report.total_violations} values fail data-quality rules (treated as missing during analysis)")
     
     print("\n✅ Data preparation complete! You can now run the analysis.")
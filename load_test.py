@@ -0,0 +1,428 @@
+"""
+Healthcare Data Analysis - Dashboard Load Test
+Serves app.py from one `streamlit run` process, drives concurrent browser sessions against it
+over the websocket protocol and reports rerun latency, throughput and the server's memory
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+DEFAULT_SESSIONS = 4
+DEFAULT_STEPS = 10
+DEFAULT_TIMEOUT = 300
+
+# Seconds to wait for the server to answer its health check
+STARTUP_TIMEOUT = 120
+
+# Seconds between samples of the server's RSS
+RSS_SAMPLE_INTERVAL = 0.2
+
+# Terms a user might type into the Data Explorer search box
+SEARCH_TERMS = ['1', '25', '33', '0.5', '120', '']
+
+PERCENTILES = [50, 90, 95, 99]
+
+# Root container of a delta: the main area is 0, the sidebar 1
+SIDEBAR = 1
+
+
+def read_rss(pid):
+    """(current, peak) resident set size of process `pid` in MB"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['VmRSS'].split()[0]) / 1024, int(fields['VmHWM'].split()[0]) / 1024
+    except (OSError, KeyError):
+        # No procfs (e.g. macOS): ps only knows the current RSS, the peak comes from sampling
+        out = subprocess.run(['ps', '-o', 'rss=', '-p', str(pid)], capture_output=True, text=True).stdout
+        rss = int(out.split()[0]) / 1024 if out.strip() else 0.0
+        return rss, rss
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+def free_port():
+    """A TCP port nothing is listening on"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(script, port, log):
+    """Start `streamlit run script` headless on `port`, logging to the file object `log`"""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', script,
+         '--server.headless', 'true', '--server.port', str(port),
+         '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false'],
+        stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if server.poll() is not None:
+            break
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    stop_server(server)
+    log.seek(0)
+    raise RuntimeError(f"Streamlit server did not start:\n{log.read().decode(errors='replace')[-2000:]}")
+
+
+def stop_server(server):
+    server.terminate()
+    try:
+        server.wait(10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+# ---------------------------------------------------------------------------
+# Sessions
+# ---------------------------------------------------------------------------
+
+class Session:
+    """
+    One browser tab: a websocket to the server plus the widget values its user has set
+
+    Like the browser, the session remembers the widgets drawn by the last run
+    and sends the values the user changed with every rerun request.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}
+        self.states = {}
+
+    def find(self, kind, sidebar=False, label=lambda label: True):
+        """Widgets of one proto type (e.g. 'slider') from the last run whose label matches"""
+        return [proto for name, proto, in_sidebar in self.widgets.values()
+                if name == kind and in_sidebar == sidebar and label(proto.label)]
+
+    def value(self, proto, field):
+        """Current value of a widget: what the user set, else its default"""
+        state = self.states.get(proto.id)
+        if state is None:
+            return proto.default
+        value = getattr(state, field)
+        return value.data if field.endswith('_array_value') else value
+
+    def set(self, proto, field, value):
+        """Change a widget the way the browser reports it: one WidgetState per widget"""
+        state = WidgetState(id=proto.id)
+        if field.endswith('_array_value'):
+            getattr(state, field).data.extend(value)
+        else:
+            setattr(state, field, value)
+        self.states[proto.id] = state
+
+    async def rerun(self):
+        """Request a rerun and read the new page until the script finishes; returns the error shown, if any"""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ''
+        msg.rerun_script.widget_states.widgets.extend(
+            state for widget_id, state in self.states.items() if widget_id in self.widgets
+        )
+        await self.ws.send(msg.SerializeToString())
+
+        self.widgets = {}
+        error = None
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.ws.recv())
+            kind = fwd.WhichOneof('type')
+            if kind == 'delta' and fwd.delta.WhichOneof('type') == 'new_element':
+                element = fwd.delta.new_element
+                name = element.WhichOneof('type')
+                proto = getattr(element, name)
+                if name == 'exception':
+                    if not proto.is_warning and error is None:
+                        error = f"{proto.type}: {proto.message}"
+                elif 'id' in proto.DESCRIPTOR.fields_by_name and proto.id:
+                    self.widgets[proto.id] = (name, proto, fwd.metadata.delta_path[0] == SIDEBAR)
+            elif kind == 'script_finished':
+                status = fwd.script_finished
+                if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    return error or "Script failed to compile"
+                if status == ForwardMsg.FINISHED_SUCCESSFULLY:
+                    return error
+
+
+# ---------------------------------------------------------------------------
+# Interactions
+#
+# Each action changes one widget the way a user would and returns False when
+# the current page has no such widget (e.g. no gender column in the dataset).
+# The rerun itself is timed by the session.
+# ---------------------------------------------------------------------------
+
+def move_age_slider(session, rng):
+    """Narrow the sidebar age range to a random window"""
+    sliders = session.find('slider', sidebar=True, label=lambda label: 'range' in label.lower())
+    if not sliders:
+        return False
+    slider = sliders[0]
+    low, high = sorted(rng.choice(np.arange(int(slider.min), int(slider.max) + 1), size=2, replace=False))
+    session.set(slider, 'double_array_value', [float(low), float(high)])
+    return True
+
+
+def change_gender_filter(session, rng):
+    """Pick a random non-empty subset of the sidebar gender options"""
+    selects = session.find('multiselect', sidebar=True)
+    if not selects:
+        return False
+    options = list(selects[0].options)
+    chosen = [opt for opt in options if rng.random() < 0.7] or options[:1]
+    session.set(selects[0], 'string_array_value', chosen)
+    return True
+
+
+def select_features(session, rng):
+    """Choose a different set of features in the Visual Insights tab"""
+    selects = session.find('multiselect', label=lambda label: label.startswith('Select features'))
+    if not selects:
+        return False
+    options = list(selects[0].options)
+    size = int(rng.integers(1, min(len(options), 6) + 1))
+    session.set(selects[0], 'string_array_value', [str(opt) for opt in rng.choice(options, size=size, replace=False)])
+    return True
+
+
+def search_data(session, rng):
+    """Type a search term in the Data Explorer tab"""
+    inputs = session.find('text_input', label=lambda label: label.startswith('Search'))
+    if not inputs:
+        return False
+    session.set(inputs[0], 'string_value', str(rng.choice(SEARCH_TERMS)))
+    return True
+
+
+def toggle_wide_mode(session, rng):
+    """Flip the wide-feature heatmap mode"""
+    boxes = session.find('checkbox', sidebar=True, label=lambda label: label == 'Wide-feature mode')
+    if not boxes:
+        return False
+    session.set(boxes[0], 'bool_value', not session.value(boxes[0], 'bool_value'))
+    return True
+
+
+# Relative frequency of each interaction in a session
+ACTIONS = {
+    'age_slider': (move_age_slider, 3),
+    'gender_filter': (change_gender_filter, 2),
+    'select_features': (select_features, 2),
+    'search': (search_data, 3),
+    'wide_mode': (toggle_wide_mode, 1),
+}
+
+
+async def run_session(session_id, ws, steps, timeout, think_time, seed):
+    """Load the app once over the websocket `ws` and perform `steps` random interactions"""
+    rng = np.random.default_rng(seed + session_id)
+    names = list(ACTIONS)
+    records = []
+
+    async def timed_run(session, action):
+        started = time.time()
+        try:
+            error = await asyncio.wait_for(session.rerun(), timeout)
+        except asyncio.TimeoutError:
+            error = f"Rerun timed out after {timeout}s"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        records.append({
+            'session': session_id,
+            'action': action,
+            'started': started,
+            'latency': time.time() - started,
+            'error': error,
+        })
+
+    session = Session(ws)
+    await timed_run(session, 'initial_load')
+
+    for _ in range(steps):
+        if records[-1]['error'] is not None:
+            break
+        if think_time:
+            await asyncio.sleep(rng.exponential(think_time))
+        # Actions whose widget is not on the page are dropped for this session
+        while names:
+            weights = np.array([ACTIONS[name][1] for name in names], dtype=np.float64)
+            name = str(rng.choice(names, p=weights / weights.sum()))
+            if ACTIONS[name][0](session, rng):
+                await timed_run(session, name)
+                break
+            names.remove(name)
+
+    return records
+
+
+async def sample_rss(pid, samples, done):
+    """Append the server's current RSS to `samples` until `done` is set"""
+    while not done.is_set():
+        samples.append(read_rss(pid)[0])
+        try:
+            await asyncio.wait_for(done.wait(), RSS_SAMPLE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def drive_sessions(url, pid, sessions, steps, timeout, think_time, seed):
+    """Run every session against the server at url; returns (records, wall time, RSS samples)"""
+    done = asyncio.Event()
+    samples = []
+    sampler = asyncio.create_task(sample_rss(pid, samples, done))
+    # Every session connects before the clock starts
+    sockets = await asyncio.gather(*(
+        websockets.connect(url, subprotocols=['streamlit'], max_size=None, ping_interval=None)
+        for _ in range(sessions)
+    ))
+    try:
+        wall_start = time.time()
+        outcomes = await asyncio.gather(*(run_session(i, ws, steps, timeout, think_time, seed)
+                                          for i, ws in enumerate(sockets)))
+        wall_time = time.time() - wall_start
+    finally:
+        await asyncio.gather(*(ws.close() for ws in sockets))
+        done.set()
+        await sampler
+    return [record for records in outcomes for record in records], wall_time, samples
+
+
+def latency_table(records):
+    """Latency percentiles in milliseconds per action and overall"""
+    df = pd.DataFrame(records)
+    ok = df[df['error'].isnull()]
+    groups = [(action, group['latency']) for action, group in ok.groupby('action')] + [('all', ok['latency'])]
+    rows = []
+    for action, latency in groups:
+        row = {'action': action, 'reruns': len(latency)}
+        row.update({f'p{p}': np.percentile(latency, p) * 1000 for p in PERCENTILES})
+        row['max'] = latency.max() * 1000
+        rows.append(row)
+    return pd.DataFrame(rows).set_index('action')
+
+
+def run_load_test(script='app.py', sessions=DEFAULT_SESSIONS, steps=DEFAULT_STEPS,
+                  timeout=DEFAULT_TIMEOUT, think_time=0.0, seed=42):
+    """
+    Run `sessions` simulated users against one server running `script`
+
+    A fresh `streamlit run` process serves every session, as in a deployment,
+    so sessions share its st.cache_data / st.cache_resource and the first
+    one to load the app fills them. Each session is a websocket client
+    speaking the browser protocol. The server's RSS is sampled throughout,
+    and its peak (VmHWM where procfs exists) is the memory cost of serving
+    that many users. With think_time=0 every session reruns back to back
+    (maximum load); otherwise sessions pause an exponentially distributed
+    time between actions.
+    """
+    script = os.path.abspath(script)
+    port = free_port()
+    with tempfile.TemporaryFile() as log:
+        server = start_server(script, port, log)
+        try:
+            rss_idle = read_rss(server.pid)[0]
+            records, wall_time, samples = asyncio.run(drive_sessions(
+                f'ws://127.0.0.1:{port}/_stcore/stream', server.pid, sessions, steps, timeout, think_time, seed
+            ))
+            rss_final, rss_hwm = read_rss(server.pid)
+        finally:
+            stop_server(server)
+
+    rss_peak = max([rss_hwm, rss_final] + samples)
+    errors = [r for r in records if r['error'] is not None]
+    completed = len(records) - len(errors)
+    return {
+        'sessions': sessions,
+        'steps': steps,
+        'think_time': think_time,
+        'wall_time': wall_time,
+        'reruns': completed,
+        'errors': len(errors),
+        'error_messages': sorted({str(r['error']) for r in errors}),
+        'throughput': completed / wall_time if wall_time > 0 else 0.0,
+        'latency': latency_table(records) if completed else pd.DataFrame(),
+        'rss_idle_mb': rss_idle,
+        'rss_peak_mb': rss_peak,
+        'rss_final_mb': rss_final,
+        'rss_per_session_mb': (rss_peak - rss_idle) / sessions,
+        'records': records,
+    }
+
+
+def print_report(results):
+    """Print a load-test summary"""
+    print("\n📊 Load Test Results")
+    print("=" * 50)
+    print(f"Sessions: {results['sessions']} × {results['steps']} interactions (think time {results['think_time']}s)")
+    print(f"Wall time: {results['wall_time']:.1f}s")
+    print(f"Completed reruns: {results['reruns']} ({results['errors']} errors)")
+    print(f"Throughput: {results['throughput']:.2f} reruns/s")
+    print(f"Server RSS: {results['rss_idle_mb']:.0f} MB idle, {results['rss_peak_mb']:.0f} MB peak, "
+          f"{results['rss_final_mb']:.0f} MB at the end")
+    print(f"Peak growth per session: {results['rss_per_session_mb']:.0f} MB")
+    if not results['latency'].empty:
+        print("\n⏱️ Rerun latency (ms):")
+        print(results['latency'].round(1).to_string())
+    for message in results['error_messages']:
+        print(f"❌ {message}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load-test the healthcare dashboard with concurrent sessions")
+    parser.add_argument('--script', default='app.py', help="Streamlit script to serve")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[DEFAULT_SESSIONS],
+                        help="concurrent sessions; several values run one test each against a fresh server")
+    parser.add_argument('--steps', type=int, default=DEFAULT_STEPS, help="interactions per session")
+    parser.add_argument('--think-time', type=float, default=0.0, help="mean pause between interactions (s)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="timeout per rerun (s)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', metavar='PATH', help="also write the results to a JSON file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("🏥 Healthcare Dashboard Load Test")
+    print("=" * 50)
+
+    summaries = []
+    for sessions in args.sessions:
+        print(f"\n🚀 Running {sessions} concurrent session(s) against one server...")
+        results = run_load_test(args.script, sessions, args.steps, args.timeout, args.think_time, args.seed)
+        print_report(results)
+        summary = {k: v for k, v in results.items() if k not in ('latency', 'records')}
+        summary['latency_ms'] = results['latency'].to_dict(orient='index')
+        summaries.append(summary)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summaries, f, indent=2, default=float)
+        print(f"\n✅ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
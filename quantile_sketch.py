@@ -0,0 +1,207 @@
+"""
+Healthcare Data Analysis - Streaming Quantile Sketches
+Mergeable per-column quantile summaries for median imputation and IQR outlier bounds
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+# Default KLL accuracy parameter; memory is roughly 3 * k values per column
+DEFAULT_K = 200
+
+# Datasets up to this many rows use exact quantiles unless told otherwise
+EXACT_ROW_LIMIT = 100_000
+
+# Fixed compaction seed so repeated runs over the same data give the same quantiles
+SKETCH_SEED = 42
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty, 2016)
+
+    Values are kept in a stack of compactors; level h holds items of weight 2^h.
+    When a level exceeds its capacity it is sorted and every other item (random
+    offset) is promoted to the next level, so memory stays around 3 * k values
+    regardless of stream length. Sketches with the same k can be merged.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=None):
+        self.k = k
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self):
+        """Normalized rank error bound holding with ~99% confidence for a single query"""
+        return 2.296 / self.k ** 0.9723
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item out stays behind so total weight is preserved exactly
+            leftover = items.size % 2
+            offset = self._rng.integers(2)
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[leftover + offset::2]])
+            self.levels[level] = items[:leftover]
+            # Adding a level shrinks the capacity of the ones below it
+            level = 0
+
+    def update(self, values):
+        """Add an array of values; NaNs are ignored"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.n += values.size
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with different k ({self.k} != {other.k})")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Approximate quantiles for an array of probabilities in [0, 1]"""
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lvl), 2 ** h, dtype=np.int64) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+
+        idx = np.minimum(np.searchsorted(cumulative, qs * self.n, side='left'), len(items) - 1)
+        result = items[idx]
+        result[qs <= 0] = self.min
+        result[qs >= 1] = self.max
+        return result
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    @property
+    def size(self):
+        """Number of values currently retained"""
+        return sum(len(lvl) for lvl in self.levels)
+
+
+class ExactQuantiles:
+    """Drop-in replacement for KLLSketch that keeps every value (small data and tests)"""
+
+    def __init__(self, k=None, seed=None):
+        self.k = k
+        self.chunks = []
+        self.n = 0
+
+    rank_error = 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.chunks.append(values)
+            self.n += values.size
+        return self
+
+    def merge(self, other):
+        self.chunks.extend(other.chunks)
+        self.n += other.n
+        return self
+
+    def quantiles(self, qs):
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        # Same linear interpolation as pandas' Series.quantile / median
+        return np.quantile(np.concatenate(self.chunks), qs)
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    @property
+    def size(self):
+        return self.n
+
+
+def build_sketches(chunks, columns=None, exact=False, k=DEFAULT_K, seed=SKETCH_SEED):
+    """
+    Build one sketch per numerical column in a single pass over DataFrame chunks
+
+    `chunks` may be a single DataFrame or any iterable of them, e.g. the reader
+    returned by pd.read_csv(..., chunksize=...).
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+
+    sketch_cls = ExactQuantiles if exact else KLLSketch
+    sketches = None
+    for chunk in chunks:
+        if sketches is None:
+            if columns is None:
+                columns = chunk.select_dtypes(include=[np.number]).columns
+            sketches = {col: sketch_cls(k=k, seed=seed) for col in columns}
+        for col in columns:
+            sketches[col].update(pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan))
+    return sketches or {}
+
+
+def sketch_csv(path, chunksize=100_000, **kwargs):
+    """Sketch the numerical columns of a CSV file without loading it into memory"""
+    return build_sketches(pd.read_csv(path, chunksize=chunksize), **kwargs)
+
+
+def merge_sketches(sketch_dicts):
+    """Merge per-column sketches built by separate workers or over separate chunks; inputs are left unchanged"""
+    merged = {}
+    for sketches in sketch_dicts:
+        for col, sketch in sketches.items():
+            if col in merged:
+                merged[col].merge(sketch)
+            else:
+                merged[col] = copy.deepcopy(sketch)
+    return merged
+
+
+def sketch_medians(sketches):
+    """Median of each column, for imputing missing values"""
+    return pd.Series({col: sketch.quantile(0.5) for col, sketch in sketches.items()}, dtype=np.float64)
+
+
+def iqr_bounds(sketches, whisker=1.5):
+    """Return (lower, upper) Series of Q1 - whisker*IQR and Q3 + whisker*IQR per column"""
+    quartiles = {col: sketch.quantiles([0.25, 0.75]) for col, sketch in sketches.items()}
+    q1 = pd.Series({col: q[0] for col, q in quartiles.items()}, dtype=np.float64)
+    q3 = pd.Series({col: q[1] for col, q in quartiles.items()}, dtype=np.float64)
+    iqr = q3 - q1
+    return q1 - whisker * iqr, q3 + whisker * iqr
@@ -0,0 +1,407 @@
+"""
+Healthcare Data Analysis - Lazy Query Engine
+Pushes dashboard filters, projections and aggregates down to DuckDB over a Parquet cache
+"""
+
+import hashlib
+import inspect
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_validation import LABEL_COLUMNS, SCHEMAS
+from quantile_sketch import EXACT_ROW_LIMIT
+
+try:
+    import duckdb
+except ImportError:  # optional dependency; the dashboard falls back to eager pandas
+    duckdb = None
+
+PARQUET_CACHE_DIR = '.parquet_cache'
+
+# CSV extracts larger than this are served out-of-core by default
+LAZY_FILE_BYTES = 512 * 1024**2
+
+# Maximum rows the Data Explorer pulls into memory for display
+DISPLAY_ROW_LIMIT = 10_000
+
+# Maximum rows a CSV export holds in the Streamlit session
+EXPORT_ROW_LIMIT = 1_000_000
+
+# Hidden Parquet column holding one violation bit per data-quality rule
+VIOLATIONS_COLUMN = '_violations'
+
+NUMERIC_TYPES = ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT',
+                 'UINTEGER', 'UBIGINT', 'FLOAT', 'DOUBLE', 'REAL')
+
+
+def is_available():
+    """True when DuckDB is installed"""
+    return duckdb is not None
+
+
+def _ident(name):
+    """Quote a column name for SQL"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(value):
+    """Quote a string literal for SQL statements that cannot take parameters"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _is_numeric(sql_type):
+    return sql_type.upper().startswith(NUMERIC_TYPES) or sql_type.upper().startswith('DECIMAL')
+
+
+def _invalid_condition(rule):
+    """SQL predicate that is true where `rule` is violated"""
+    column = _ident(rule.column)
+    if rule.kind == 'zero_as_missing':
+        return f"{column} = 0"
+    if rule.kind == 'range':
+        return f"({column} < {rule.low!r} OR {column} > {rule.high!r})"
+    if rule.kind == 'domain':
+        return f"{column} NOT IN ({', '.join(repr(float(v)) for v in rule.allowed)})"
+    raise ValueError(f"Unknown rule kind: {rule.kind}")
+
+
+def _violation_flags(rules, schema):
+    """
+    SQL boolean per rule, matching ValidationReport: NULLs never violate, and
+    range/domain rules skip zeros already flagged by the column's zero-as-missing rule
+    """
+    numeric = {name for name, sql_type, *_ in schema if _is_numeric(sql_type)}
+    zero_columns = {rule.column for rule in rules if rule.kind == 'zero_as_missing'}
+    flags = []
+    for rule in rules:
+        if rule.column not in numeric:
+            flags.append('FALSE')
+            continue
+        condition = _invalid_condition(rule)
+        if rule.kind != 'zero_as_missing' and rule.column in zero_columns:
+            condition = f"({condition} AND {_ident(rule.column)} <> 0)"
+        flags.append(f"coalesce({condition}, FALSE)")
+    return flags
+
+
+def build_parquet_cache(csv_path, dataset_type=None, cache_dir=PARQUET_CACHE_DIR):
+    """
+    Convert a CSV extract into a cleaned Parquet file, reusing it while the CSV is unchanged
+
+    Cleaning mirrors preprocess_data(): values failing the dataset type's
+    data-quality rules become missing (rows with an invalid label are
+    dropped), numerical gaps are filled with the median, categorical gaps
+    with the mode, and duplicate rows are dropped. Each row keeps its rule
+    violations as bits of VIOLATIONS_COLUMN (bit i for rule i) so the
+    dashboard can count them under any filter. DuckDB streams the conversion
+    and spills to disk, so the CSV never has to fit in memory. Returns the
+    Parquet path.
+    """
+    stat = os.stat(csv_path)
+    rules = SCHEMAS.get(dataset_type, [])
+    # The cleaning code is part of the key so cleaning changes rebuild stale caches
+    cleaning = ''.join(inspect.getsource(func) for func in (_invalid_condition, _violation_flags, build_parquet_cache))
+    fingerprint = (f'{os.path.abspath(csv_path)}:{stat.st_size}:{stat.st_mtime_ns}:{dataset_type}:'
+                   f'{[rule.name for rule in rules]}:{cleaning}')
+    key = hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    parquet_path = os.path.join(cache_dir, f'{stem}_{key}.parquet')
+    if os.path.exists(parquet_path):
+        return parquet_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    con = duckdb.connect()
+    try:
+        con.execute(f"SET temp_directory = {_literal(os.path.join(cache_dir, 'spill'))}")
+        con.execute(f"CREATE VIEW source AS SELECT * FROM read_csv_auto({_literal(csv_path)})")
+        schema = con.execute("DESCRIBE source").fetchall()
+
+        # Null out rule violations and drop rows with invalid labels, like data_validation.mask_invalid()
+        if len(rules) > 64:
+            raise ValueError(f"At most 64 rules fit in {VIOLATIONS_COLUMN}, got {len(rules)}")
+        flags = _violation_flags(rules, schema)
+        columns, drop = [], []
+        for name, sql_type, *_ in schema:
+            invalid = [flag for rule, flag in zip(rules, flags) if rule.column == name and flag != 'FALSE']
+            if invalid and name in LABEL_COLUMNS:
+                drop.extend(invalid)
+            if invalid and name not in LABEL_COLUMNS:
+                columns.append(f"CASE WHEN {' OR '.join(invalid)} THEN NULL ELSE {_ident(name)} END AS {_ident(name)}")
+            else:
+                columns.append(_ident(name))
+        if rules:
+            bits = ' | '.join(f"CASE WHEN {flag} THEN {1 << i}::UBIGINT ELSE 0::UBIGINT END"
+                              for i, flag in enumerate(flags))
+            columns.append(f"{bits} AS {VIOLATIONS_COLUMN}")
+        where = f"WHERE NOT ({' OR '.join(drop)})" if drop else ''
+        con.execute(f"CREATE VIEW raw AS SELECT {', '.join(columns)} FROM source {where}")
+        n_rows = con.execute("SELECT count(*) FROM raw").fetchone()[0]
+
+        # Exact medians on small data, DuckDB's streaming t-digest on large data
+        median = 'median({})' if n_rows <= EXACT_ROW_LIMIT else 'approx_quantile({}, 0.5)'
+        aggregates = []
+        for name, sql_type, *_ in schema:
+            fill = median.format(_ident(name)) if _is_numeric(sql_type) else f"mode({_ident(name)})"
+            aggregates += [f"count({_ident(name)})", fill]
+        row = con.execute(f"SELECT {', '.join(aggregates)} FROM raw").fetchone()
+
+        select, params = [], []
+        for i, (name, sql_type, *_) in enumerate(schema):
+            non_null, fill = row[2 * i], row[2 * i + 1]
+            if non_null == n_rows or fill is None:
+                select.append(_ident(name))
+            elif _is_numeric(sql_type):
+                # Like pandas, a filled numerical column becomes floating point
+                select.append(f"COALESCE(CAST({_ident(name)} AS DOUBLE), ?) AS {_ident(name)}")
+                params.append(float(fill))
+            else:
+                select.append(f"COALESCE({_ident(name)}, ?) AS {_ident(name)}")
+                params.append(fill)
+        if dataset_type is not None:
+            select.append(f"{_literal(dataset_type)} AS dataset_type")
+
+        if rules:
+            # Duplicates are judged on the cleaned values only, as drop_duplicates() sees them
+            query = f"SELECT {', '.join(select)}, min({VIOLATIONS_COLUMN}) AS {VIOLATIONS_COLUMN} FROM raw GROUP BY ALL"
+        else:
+            query = f"SELECT DISTINCT {', '.join(select)} FROM raw"
+        tmp_path = f'{parquet_path}.tmp'
+        con.execute(f"COPY ({query}) TO {_literal(tmp_path)} (FORMAT PARQUET)", params)
+        os.replace(tmp_path, parquet_path)
+    finally:
+        con.close()
+    return parquet_path
+
+
+class LazyDataset:
+    """
+    A Parquet dataset queried on demand
+
+    Every method takes the dashboard's filter dict (see app.apply_filters) and
+    compiles it, plus any search term and column selection, into a single SQL
+    query. DuckDB only reads the referenced columns, skips row groups the
+    predicates rule out, and runs multi-threaded; only the aggregate result is
+    returned as a pandas object.
+    """
+
+    def __init__(self, parquet_path, threads=None):
+        self.path = parquet_path
+        self.con = duckdb.connect()
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+        self.source = f"read_parquet({_literal(parquet_path)})"
+        schema = self.con.execute(f"DESCRIBE SELECT * FROM {self.source}").fetchall()
+        self.columns = [name for name, *_ in schema if name != VIOLATIONS_COLUMN]
+        self.types = {name: sql_type for name, sql_type, *_ in schema}
+        self.numeric_columns = [name for name in self.columns if _is_numeric(self.types[name])]
+
+    def _query(self, sql, params=None):
+        # A cursor per call so concurrent Streamlit sessions can share one dataset
+        with self.con.cursor() as cur:
+            return cur.execute(sql, params or []).df()
+
+    def _scalar_row(self, sql, params=None):
+        with self.con.cursor() as cur:
+            return cur.execute(sql, params or []).fetchone()
+
+    def _where(self, filters, search_term=None, search_columns=None):
+        """WHERE clause and parameters for the sidebar filters and search term"""
+        clauses, params = [], []
+        if filters.get('age_col') is not None:
+            clauses.append(f"{_ident(filters['age_col'])} BETWEEN ? AND ?")
+            params.extend(filters['age_range'])
+        if filters.get('gender_col') is not None:
+            selected = list(filters['selected_genders'])
+            if selected:
+                clauses.append(f"{_ident(filters['gender_col'])} IN ({', '.join('?' * len(selected))})")
+                params.extend(np.asarray(selected).tolist())
+            else:
+                clauses.append("FALSE")
+        if search_term:
+            columns = search_columns or self.columns
+            # Case-insensitive regex match, as pandas' str.contains(case=False)
+            clauses.append('(' + ' OR '.join(
+                f"coalesce(regexp_matches(CAST({_ident(col)} AS VARCHAR), ?, 'i'), FALSE)" for col in columns
+            ) + ')')
+            params.extend([search_term] * len(columns))
+        return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def count(self, filters, search_term=None):
+        where, params = self._where(filters, search_term)
+        return self._scalar_row(f"SELECT count(*) FROM {self.source} {where}", params)[0]
+
+    def column_range(self, column):
+        return self._scalar_row(f"SELECT min({_ident(column)}), max({_ident(column)}) FROM {self.source}")
+
+    def distinct_values(self, column):
+        values = self._query(f"SELECT DISTINCT {_ident(column)} AS v FROM {self.source} ORDER BY 1")
+        return values['v'].tolist()
+
+    def _quantile(self, column, qs, exact):
+        if exact:
+            return f"quantile_cont({_ident(column)}, {list(qs)})"
+        return f"approx_quantile({_ident(column)}, {list(qs)})"
+
+    def column_info(self, filters):
+        """Column, Data Type, Non-Null Count, Null Count for the filtered rows"""
+        where, params = self._where(filters)
+        counts = self._scalar_row(
+            f"SELECT count(*), {', '.join(f'count({_ident(col)})' for col in self.columns)} FROM {self.source} {where}",
+            params
+        )
+        total, non_null = counts[0], counts[1:]
+        return pd.DataFrame({
+            'Column': self.columns,
+            'Data Type': [self.types[col] for col in self.columns],
+            'Non-Null Count': non_null,
+            'Null Count': [total - n for n in non_null],
+        })
+
+    def summary_stats(self, filters):
+        """Same keys as create_summary_stats(); duplicates were removed when the cache was built"""
+        info = self.column_info(filters)
+        total = int(info['Non-Null Count'].iloc[0] + info['Null Count'].iloc[0]) if len(info) else 0
+        return {
+            'Total Records': total,
+            'Total Features': len(self.columns),
+            'Missing Values': int(info['Null Count'].sum()),
+            'Duplicate Records': 0,
+            'Data Size': f"{os.path.getsize(self.path) / 1024**2:.2f} MB on disk",
+        }
+
+    def validation_summary(self, filters, rules):
+        """
+        Same frame as ValidationReport.summary() for the filtered rows
+
+        `rules` must be the rule list the cache was built with (SCHEMAS[dataset_type]).
+        """
+        where, params = self._where(filters)
+        if rules and VIOLATIONS_COLUMN in self.types:
+            counts = self._scalar_row(
+                f"SELECT count(*), {', '.join(f'count(*) FILTER ({VIOLATIONS_COLUMN} & {1 << i}::UBIGINT <> 0)' for i in range(len(rules)))} "
+                f"FROM {self.source} {where}", params)
+        else:
+            counts = (self.count(filters), *([0] * len(rules)))
+        n_rows, violations = counts[0], counts[1:]
+        return pd.DataFrame({
+            'Rule': [rule.name for rule in rules],
+            'Column': [rule.column for rule in rules],
+            'Violations': [int(v) for v in violations],
+            'Violation Rate': [v / n_rows if n_rows else 0.0 for v in violations],
+        })
+
+    def describe(self, filters, columns=None):
+        """DataFrame.describe() computed in the engine"""
+        columns = list(columns) if columns is not None else self.numeric_columns
+        if not columns:
+            return pd.DataFrame()
+        where, params = self._where(filters)
+        exact = self.count(filters) <= EXACT_ROW_LIMIT
+        aggregates = []
+        for col in columns:
+            c = _ident(col)
+            aggregates += [f"count({c})", f"avg({c})", f"stddev_samp({c})", f"min({c})",
+                           self._quantile(col, [0.25, 0.5, 0.75], exact), f"max({c})"]
+        row = self._scalar_row(f"SELECT {', '.join(aggregates)} FROM {self.source} {where}", params)
+
+        stats = {}
+        for i, col in enumerate(columns):
+            count, mean, std, low, quartiles, high = row[i * 6:(i + 1) * 6]
+            quartiles = quartiles or [None] * 3
+            stats[col] = [count, mean, std, low, *quartiles, high]
+        return pd.DataFrame(stats, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'], dtype=float)
+
+    def histogram(self, filters, column, bins=30, by=None):
+        """
+        Bin counts computed in the engine: (edges, counts)
+
+        With `by`, counts is a DataFrame with one column per value of `by`.
+        """
+        where, params = self._where(filters)
+        low, high = self._scalar_row(
+            f"SELECT min({_ident(column)}), max({_ident(column)}) FROM {self.source} {where}", params)
+        if low is None:
+            return np.array([0.0, 1.0]), np.zeros(1)
+        if high == low:
+            high = low + 1
+        edges = np.linspace(low, high, bins + 1)
+        width = (high - low) / bins
+        bucket = f"least(floor(({_ident(column)} - {low!r}) / {width!r}), {bins - 1})::INTEGER"
+        group = f", {_ident(by)}" if by is not None else ''
+        condition = f"{where} {'AND' if where else 'WHERE'} {_ident(column)} IS NOT NULL"
+        counts = self._query(
+            f"SELECT {bucket} AS bucket{group}, count(*) AS n FROM {self.source} {condition} GROUP BY ALL",
+            params
+        )
+        if by is None:
+            result = np.zeros(bins)
+            result[counts['bucket'].to_numpy()] = counts['n'].to_numpy()
+            return edges, result
+        table = counts.pivot(index='bucket', columns=by, values='n').reindex(range(bins)).fillna(0)
+        return edges, table
+
+    def corr(self, filters, columns=None):
+        """Pearson correlation matrix from one pass of pairwise corr() aggregates"""
+        columns = list(columns) if columns is not None else self.numeric_columns
+        where, params = self._where(filters)
+        pairs = [(i, j) for i in range(len(columns)) for j in range(i + 1, len(columns))]
+        matrix = np.eye(len(columns))
+        if pairs:
+            row = self._scalar_row(
+                f"SELECT {', '.join(f'corr({_ident(columns[i])}, {_ident(columns[j])})' for i, j in pairs)} "
+                f"FROM {self.source} {where}", params)
+            for (i, j), value in zip(pairs, row):
+                matrix[i, j] = matrix[j, i] = np.nan if value is None else value
+        return pd.DataFrame(matrix, index=columns, columns=columns)
+
+    def corr_with(self, filters, columns, other):
+        """Correlation of each column with `other`: one corr() aggregate per column"""
+        columns = list(columns)
+        where, params = self._where(filters)
+        row = self._scalar_row(
+            f"SELECT {', '.join(f'corr({_ident(col)}, {_ident(other)})' for col in columns)} "
+            f"FROM {self.source} {where}", params) if columns else []
+        return pd.Series([np.nan if value is None else value for value in row], index=columns, dtype=np.float64)
+
+    def group_describe(self, filters, by, column):
+        """df.groupby(by)[column].describe() computed in the engine"""
+        where, params = self._where(filters)
+        exact = self.count(filters) <= EXACT_ROW_LIMIT
+        c = _ident(column)
+        stats = self._query(
+            f"SELECT {_ident(by)} AS grp, count({c}) AS count, avg({c}) AS mean, stddev_samp({c}) AS std, "
+            f"min({c}) AS min, {self._quantile(column, [0.25, 0.5, 0.75], exact)} AS q, max({c}) AS max "
+            f"FROM {self.source} {where} GROUP BY 1 ORDER BY 1", params
+        )
+        quartiles = pd.DataFrame(stats['q'].tolist(), columns=['25%', '50%', '75%'], index=stats.index)
+        stats = pd.concat([stats.drop(columns='q'), quartiles], axis=1).set_index('grp')
+        stats.index.name = by
+        return stats[['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']].astype(float)
+
+    def fetch(self, filters, columns=None, search_term=None, limit=DISPLAY_ROW_LIMIT):
+        """Rows matching the filters and search term, projected to `columns`"""
+        columns = list(columns) if columns else self.columns
+        where, params = self._where(filters, search_term)
+        sql = f"SELECT {', '.join(_ident(col) for col in columns)} FROM {self.source} {where}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self._query(sql, params)
+
+    def export_csv(self, filters, columns=None, search_term=None, limit=EXPORT_ROW_LIMIT):
+        """CSV bytes for the first `limit` filtered rows, written by the engine rather than pandas"""
+        columns = list(columns) if columns else self.columns
+        where, params = self._where(filters, search_term)
+        sql = f"SELECT {', '.join(_ident(col) for col in columns)} FROM {self.source} {where}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        tmp_path = f'{self.path}.{os.getpid()}.{id(params)}.csv'
+        try:
+            with self.con.cursor() as cur:
+                cur.execute(f"COPY ({sql}) TO {_literal(tmp_path)} (HEADER)", params)
+            with open(tmp_path, 'rb') as f:
+                return f.read()
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,617 @@
+"""
+Healthcare Data Analysis - Headless Report Pipeline
+Runs the notebook analysis stages as a dependency graph and writes static HTML reports
+"""
+
+import base64
+import hashlib
+import html
+import inspect
+import io
+import os
+import pickle
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+import seaborn as sns
+from sklearn.ensemble import RandomForestClassifier
+import data_validation
+import quantile_sketch
+import wide_features
+from data_validation import SCHEMAS, mask_invalid, validate
+from quantile_sketch import EXACT_ROW_LIMIT, SKETCH_SEED, build_sketches, iqr_bounds, sketch_medians
+from wide_features import WIDE_FEATURE_THRESHOLD, blocked_corr, plot_wide_heatmap, top_k_pairs
+import warnings
+
+warnings.filterwarnings('ignore')
+
+CACHE_DIR = '.report_cache'
+
+# Stages not written to the cache: reloading the CSV costs about as much as
+# unpickling it, and the rendered HTML only repeats the other stages' images
+UNCACHED_STAGES = {'load', 'render'}
+TARGET_NAMES = ['outcome', 'target']
+
+
+def _file_digest(path):
+    """Return the SHA-256 digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _figure_to_base64(fig):
+    """Render a matplotlib figure to a base64 encoded PNG"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def _split_columns(df):
+    """Return (feature_cols, target_cols) for the numerical columns of a dataset"""
+    numerical_cols = df.select_dtypes(include=[np.number]).columns
+    target_cols = [col for col in numerical_cols if any(t in col.lower() for t in TARGET_NAMES)]
+    feature_cols = [col for col in numerical_cols if col not in target_cols]
+    return feature_cols, target_cols
+
+
+# ---------------------------------------------------------------------------
+# Stages
+#
+# Every stage is a module level function so it can run in a worker process.
+# Its positional arguments are the results of the stages it depends on,
+# followed by any static arguments declared in the graph.
+# ---------------------------------------------------------------------------
+
+def stage_load(path, digest):
+    """Load a dataset extract; `digest` ties the cache key to the file contents"""
+    df = pd.read_csv(path)
+    dataset_type = 'diabetes' if 'Outcome' in df.columns else 'heart_disease'
+    return {'df': df, 'dataset_type': dataset_type, 'source': os.path.basename(path)}
+
+
+def stage_preprocess(loaded):
+    """Fill missing values, drop duplicates and cap IQR outliers"""
+    df_clean = loaded['df'].copy()
+    log = []
+
+    # Implausible values (e.g. zero glucose) become missing before imputation
+    report = validate(df_clean, SCHEMAS.get(loaded['dataset_type'], []))
+    if report.total_violations > 0:
+        rows_before = len(df_clean)
+        df_clean = mask_invalid(df_clean, report)
+        flagged = report.summary()
+        for _, row in flagged[flagged['Violations'] > 0].iterrows():
+            log.append(f"{row['Rule']}: {row['Violations']} values treated as missing")
+        if len(df_clean) < rows_before:
+            log.append(f"Dropped {rows_before - len(df_clean)} rows with an invalid outcome label")
+
+    exact = len(df_clean) <= EXACT_ROW_LIMIT
+    missing_before = int(df_clean.isnull().sum().sum())
+    if missing_before > 0:
+        numerical_cols = df_clean.select_dtypes(include=[np.number]).columns
+        medians = sketch_medians(build_sketches(df_clean[numerical_cols], exact=exact, seed=SKETCH_SEED))
+        for col in numerical_cols:
+            if df_clean[col].isnull().any():
+                log.append(f"{col}: filled missing values with median ({medians[col]:.2f})")
+        df_clean[numerical_cols] = df_clean[numerical_cols].fillna(medians)
+
+        categorical_cols = df_clean.select_dtypes(include=['object']).columns
+        for col in categorical_cols:
+            if df_clean[col].isnull().any():
+                mode = df_clean[col].mode()
+                mode_val = mode[0] if not mode.empty else 'Unknown'
+                df_clean[col] = df_clean[col].fillna(mode_val)
+                log.append(f"{col}: filled missing values with mode ({mode_val})")
+
+    duplicates = int(df_clean.duplicated().sum())
+    if duplicates > 0:
+        df_clean = df_clean.drop_duplicates()
+        log.append(f"Removed {duplicates} duplicate records")
+
+    numerical_cols = [col for col in df_clean.select_dtypes(include=[np.number]).columns
+                      if col not in ['Outcome', 'target']]
+    if numerical_cols:
+        lower, upper = iqr_bounds(build_sketches(df_clean[numerical_cols], exact=exact, seed=SKETCH_SEED))
+        values = df_clean[numerical_cols]
+        outliers = ((values < lower) | (values > upper)).sum()
+        for col in outliers[outliers > 0].index:
+            log.append(f"{col}: capped {int(outliers[col])} outliers (IQR method)")
+        df_clean[numerical_cols] = values.clip(lower=lower, upper=upper, axis=1)
+
+    return {
+        'df': df_clean,
+        'dataset_type': loaded['dataset_type'],
+        'source': loaded['source'],
+        'missing_before': missing_before,
+        'log': log,
+    }
+
+
+def stage_summary(processed):
+    """Dataset information and statistical summary"""
+    df = processed['df']
+    return {
+        'Total Records': len(df),
+        'Total Features': len(df.columns),
+        'Missing Values': int(df.isnull().sum().sum()),
+        'Duplicate Records': int(df.duplicated().sum()),
+        'Memory Usage': f"{df.memory_usage(deep=True).sum() / 1024**2:.2f} MB",
+        'describe': df.describe(),
+    }
+
+
+def _plotted_features(df, feature_cols, target_cols):
+    """
+    Feature columns to draw per-column charts for, and a note when some are left out
+
+    Wide extracts keep the WIDE_FEATURE_THRESHOLD columns most correlated with
+    the target (highest variance when there is no target), so figures stay a
+    readable size.
+    """
+    if len(feature_cols) <= WIDE_FEATURE_THRESHOLD:
+        return feature_cols, None
+    if target_cols:
+        ranking = df[feature_cols].corrwith(df[target_cols[0]]).abs()
+        basis = f"most correlated with {target_cols[0]}"
+    else:
+        ranking = df[feature_cols].var()
+        basis = "with the highest variance"
+    shown = ranking.fillna(-1).nlargest(WIDE_FEATURE_THRESHOLD).index.tolist()
+    return shown, f"Showing the {len(shown)} features {basis} ({len(feature_cols)} in total)"
+
+
+def stage_distributions(processed):
+    """Histogram grid for the feature columns"""
+    df = processed['df']
+    feature_cols, target_cols = _split_columns(df)
+    if not feature_cols:
+        return None
+    feature_cols, note = _plotted_features(df, feature_cols, target_cols)
+
+    n_cols = 3
+    n_rows = (len(feature_cols) + n_cols - 1) // n_cols
+    fig = Figure(figsize=(15, 5 * n_rows))
+    axes = fig.subplots(n_rows, n_cols, squeeze=False).ravel()
+
+    for ax, col in zip(axes, feature_cols):
+        ax.hist(df[col].dropna(), bins=30, alpha=0.7, color='skyblue', edgecolor='black')
+        ax.set_title(f'Distribution of {col}')
+        ax.set_xlabel(col)
+        ax.set_ylabel('Frequency')
+        ax.grid(True, alpha=0.3)
+
+    for ax in axes[len(feature_cols):]:
+        ax.set_visible(False)
+
+    fig.tight_layout()
+    return {'chart': _figure_to_base64(fig), 'note': note}
+
+
+def stage_outliers(processed):
+    """Box plots of the feature columns for outlier detection"""
+    df = processed['df']
+    feature_cols, target_cols = _split_columns(df)
+    if not feature_cols:
+        return None
+    feature_cols, note = _plotted_features(df, feature_cols, target_cols)
+
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    df[feature_cols].boxplot(ax=ax)
+    ax.set_title('Box Plots for Outlier Detection')
+    ax.set_xticklabels(feature_cols, rotation=45)
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return {'chart': _figure_to_base64(fig), 'note': note}
+
+
+def stage_correlation(processed):
+    """Correlation heatmap and the strongest feature pairs"""
+    df = processed['df']
+    numerical_cols = df.select_dtypes(include=[np.number]).columns
+    if len(numerical_cols) < 2:
+        return None
+
+    fig = Figure(figsize=(12, 8))
+    ax = fig.subplots()
+    if len(numerical_cols) > WIDE_FEATURE_THRESHOLD:
+        corr_matrix = blocked_corr(df[numerical_cols])
+        plot_wide_heatmap(corr_matrix, ax)
+    else:
+        corr_matrix = df[numerical_cols].corr()
+        mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
+        sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, square=True,
+                    mask=mask, fmt='.2f', cbar_kws={"shrink": .8}, ax=ax)
+        ax.set_title('Correlation Matrix of All Features')
+    fig.tight_layout()
+
+    top_pairs = top_k_pairs(corr_matrix, k=10)
+
+    return {'heatmap': _figure_to_base64(fig), 'top_pairs': top_pairs}
+
+
+def stage_target(processed):
+    """Distribution of the target variable"""
+    df = processed['df']
+    _, target_cols = _split_columns(df)
+    if not target_cols:
+        return None
+
+    target_col = target_cols[0]
+    target_counts = df[target_col].value_counts()
+
+    fig = Figure(figsize=(12, 5))
+    ax1, ax2 = fig.subplots(1, 2)
+    target_counts.plot(kind='bar', ax=ax1, color=['lightcoral', 'lightblue'])
+    ax1.set_title(f'Distribution of {target_col}')
+    ax1.set_xlabel(target_col)
+    ax1.set_ylabel('Count')
+    ax1.grid(True, alpha=0.3)
+    ax2.pie(target_counts.values, labels=target_counts.index, autopct='%1.1f%%',
+            colors=['lightcoral', 'lightblue'])
+    ax2.set_title(f'{target_col} Distribution (Percentage)')
+    fig.tight_layout()
+
+    return {
+        'target_col': target_col,
+        'counts': {value: int(count) for value, count in target_counts.items()},
+        'disease_rate': float((df[target_col] != 0).mean() * 100),
+        'chart': _figure_to_base64(fig),
+    }
+
+
+def stage_risk_factors(processed):
+    """Correlation with target and detailed analysis of the top three factors"""
+    df = processed['df']
+    feature_cols, target_cols = _split_columns(df)
+    if not target_cols or not feature_cols:
+        return None
+
+    target_col = target_cols[0]
+    # Only the p correlations with the target are needed, not the p x p matrix
+    correlations = df[feature_cols].corrwith(df[target_col]).abs().sort_values(ascending=False)
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    correlations.head(WIDE_FEATURE_THRESHOLD).plot(kind='barh', color='coral', ax=ax)
+    ax.set_title('Risk Factor Correlations with Target')
+    ax.set_xlabel('Absolute Correlation with Target')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+
+    factors = []
+    target_values = df[target_col].unique()
+    colors = ['lightblue', 'lightcoral']
+    for factor in correlations.head(3).index:
+        mean_0 = df[df[target_col] == 0][factor].mean()
+        mean_1 = df[df[target_col] == 1][factor].mean()
+
+        factor_fig = Figure(figsize=(12, 4))
+        ax1, ax2 = factor_fig.subplots(1, 2)
+        for j, target_val in enumerate(target_values):
+            subset = df[df[target_col] == target_val]
+            ax1.hist(subset[factor].dropna(), alpha=0.7, label=f'Target = {target_val}',
+                     bins=20, color=colors[j % len(colors)])
+        ax1.set_title(f'{factor} Distribution by Target')
+        ax1.set_xlabel(factor)
+        ax1.set_ylabel('Frequency')
+        ax1.legend()
+        ax1.grid(True, alpha=0.3)
+        df.boxplot(column=factor, by=target_col, ax=ax2)
+        ax2.set_title(f'{factor} by Target')
+        ax2.set_xlabel('Target')
+        ax2.set_ylabel(factor)
+        ax2.grid(True, alpha=0.3)
+        factor_fig.suptitle('')
+        factor_fig.tight_layout()
+
+        factors.append({
+            'factor': factor,
+            'stats': df.groupby(target_col)[factor].describe(),
+            'mean_0': float(mean_0),
+            'mean_1': float(mean_1),
+            'diff': float(mean_1 - mean_0),
+            'chart': _figure_to_base64(factor_fig),
+        })
+
+    return {
+        'target_col': target_col,
+        'correlations': correlations,
+        'chart': _figure_to_base64(fig),
+        'factors': factors,
+    }
+
+
+def stage_feature_importance(processed):
+    """Random Forest feature importance"""
+    df = processed['df']
+    feature_cols, target_cols = _split_columns(df)
+    if not target_cols or not feature_cols:
+        return None
+
+    rf = RandomForestClassifier(n_estimators=100, random_state=42)
+    rf.fit(df[feature_cols], df[target_cols[0]])
+    feature_importance = pd.DataFrame({
+        'feature': feature_cols,
+        'importance': rf.feature_importances_
+    }).sort_values('importance', ascending=False)
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.barplot(data=feature_importance.head(WIDE_FEATURE_THRESHOLD), x='importance', y='feature',
+                palette='viridis', ax=ax)
+    ax.set_title('Random Forest Feature Importance')
+    ax.set_xlabel('Importance Score')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+
+    return {'table': feature_importance, 'chart': _figure_to_base64(fig)}
+
+
+def stage_insights(processed, summary, risk):
+    """Key findings drawn from the other stages"""
+    df = processed['df']
+    feature_cols, _ = _split_columns(df)
+    total_records = summary['Total Records']
+    missing_values = summary['Missing Values']
+
+    findings = [
+        f"Missing values: {missing_values}",
+        f"Duplicate records: {summary['Duplicate Records']}",
+        f"Data completeness: {((total_records - missing_values) / max(total_records, 1)) * 100:.1f}%",
+        f"Total features analyzed: {len(feature_cols)}",
+    ]
+    if risk is not None:
+        for i, (factor, corr) in enumerate(risk['correlations'].head(3).items(), 1):
+            findings.append(f"Top risk factor {i}: {factor} ({corr:.3f} correlation)")
+    for col in feature_cols[:3]:
+        findings.append(f"{col}: Mean={df[col].mean():.2f}, Std={df[col].std():.2f}")
+    return findings
+
+
+def stage_render(processed, summary, distributions, correlation, outliers, target, risk, importance, insights):
+    """Assemble the static HTML report"""
+    def image(data, alt):
+        return f'<img alt="{html.escape(alt)}" src="data:image/png;base64,{data}">' if data else ''
+
+    title = f"{processed['dataset_type'].replace('_', ' ').title()} Report - {processed['source']}"
+    parts = [
+        '<!DOCTYPE html>',
+        '<html><head><meta charset="utf-8">',
+        f'<title>{html.escape(title)}</title>',
+        '<style>body{font-family:sans-serif;margin:2rem;color:#222}'
+        'h1{color:#1f77b4}img{max-width:100%}table{border-collapse:collapse;margin:1rem 0}'
+        'td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}'
+        '.insight-box{background:#e8f4fd;padding:1rem;border-left:5px solid #ff6b6b}</style>',
+        '</head><body>',
+        f'<h1>🏥 {html.escape(title)}</h1>',
+        '<h2>Dataset Overview</h2><ul>',
+    ]
+    for key in ['Total Records', 'Total Features', 'Missing Values', 'Duplicate Records', 'Memory Usage']:
+        parts.append(f'<li><b>{key}:</b> {summary[key]}</li>')
+    parts.append('</ul>')
+    if processed['log']:
+        parts.append('<h3>Preprocessing</h3><ul>')
+        parts.extend(f'<li>{html.escape(line)}</li>' for line in processed['log'])
+        parts.append('</ul>')
+    parts.append('<h3>Statistical Summary</h3>')
+    parts.append(summary['describe'].to_html(float_format='%.2f'))
+
+    parts.append('<h2>Exploratory Data Analysis</h2>')
+    if distributions is not None:
+        if distributions['note']:
+            parts.append(f"<p>{html.escape(distributions['note'])}</p>")
+        parts.append(image(distributions['chart'], 'Feature distributions'))
+    if correlation is not None:
+        parts.append(image(correlation['heatmap'], 'Correlation matrix'))
+        parts.append('<h3>Top 10 Feature Correlations</h3><ol>')
+        parts.extend(f'<li>{html.escape(a)} ↔ {html.escape(b)}: {corr:.3f}</li>'
+                     for a, b, corr in correlation['top_pairs'])
+        parts.append('</ol>')
+    if outliers is not None:
+        parts.append('<h3>Outlier Detection</h3>')
+        if outliers['note']:
+            parts.append(f"<p>{html.escape(outliers['note'])}</p>")
+        parts.append(image(outliers['chart'], 'Box plots for outlier detection'))
+    if target is not None:
+        parts.append(f"<h3>Target Variable: {html.escape(target['target_col'])}</h3>")
+        parts.append(image(target['chart'], 'Target distribution'))
+
+    if risk is not None:
+        parts.append('<h2>Risk Factor Analysis</h2>')
+        parts.append(image(risk['chart'], 'Risk factor correlations'))
+        for item in risk['factors']:
+            parts.append(f"<h3>{html.escape(item['factor'])} Analysis</h3>")
+            parts.append(image(item['chart'], f"{item['factor']} by target"))
+            parts.append(item['stats'].to_html(float_format='%.2f'))
+            direction = 'Higher' if item['diff'] > 0 else 'Lower'
+            parts.append(
+                '<div class="insight-box">'
+                f"• Average {html.escape(item['factor'])} for non-disease: {item['mean_0']:.2f}<br>"
+                f"• Average {html.escape(item['factor'])} for disease: {item['mean_1']:.2f}<br>"
+                f"• Difference: {item['diff']:.2f}<br>"
+                f'• {direction} values increase disease risk</div>'
+            )
+    if importance is not None:
+        parts.append('<h2>Machine Learning Feature Importance</h2>')
+        parts.append(image(importance['chart'], 'Feature importance'))
+        parts.append(importance['table'].to_html(index=False, float_format='%.4f'))
+
+    parts.append('<h2>Key Insights</h2><ul>')
+    parts.extend(f'<li>{html.escape(line)}</li>' for line in insights)
+    parts.append('</ul></body></html>')
+    return '\n'.join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Graph execution
+# ---------------------------------------------------------------------------
+
+# stage name -> (function, dependencies)
+STAGES = {
+    'load': (stage_load, []),
+    'preprocess': (stage_preprocess, ['load']),
+    'summary': (stage_summary, ['preprocess']),
+    'distributions': (stage_distributions, ['preprocess']),
+    'correlation': (stage_correlation, ['preprocess']),
+    'outliers': (stage_outliers, ['preprocess']),
+    'target': (stage_target, ['preprocess']),
+    'risk': (stage_risk_factors, ['preprocess']),
+    'importance': (stage_feature_importance, ['preprocess']),
+    'insights': (stage_insights, ['preprocess', 'summary', 'risk']),
+    'render': (stage_render, ['preprocess', 'summary', 'distributions', 'correlation', 'outliers',
+                              'target', 'risk', 'importance', 'insights']),
+}
+
+
+def build_graph(paths):
+    """
+    Expand STAGES into one node per (dataset, stage)
+
+    Returns a dict of node id -> (function, dependency node ids, static args)
+    """
+    graph = {}
+    for path in paths:
+        for name, (func, deps) in STAGES.items():
+            args = (path, _file_digest(path)) if name == 'load' else ()
+            graph[(path, name)] = (func, [(path, dep) for dep in deps], args)
+    return graph
+
+
+def _code_digest():
+    """
+    Digest of all code and rules the stages depend on
+
+    Covers this module (stage helpers such as _split_columns and TARGET_NAMES),
+    the helper modules and the validation rules, so editing any of them
+    invalidates every cached stage result.
+    """
+    digest = hashlib.sha256()
+    for module in (sys.modules[__name__], data_validation, quantile_sketch, wide_features):
+        digest.update(inspect.getsource(module).encode())
+    for dataset_type, rules in sorted(SCHEMAS.items()):
+        digest.update(repr((dataset_type, [rule.name for rule in rules])).encode())
+    return digest.hexdigest()
+
+
+def _node_key(node, func, dep_keys, args, code_digest):
+    """Cache key covering the stage code, the shared code digest, its static args and its inputs' keys"""
+    digest = hashlib.sha256()
+    digest.update(node[1].encode())
+    digest.update(code_digest.encode())
+    digest.update(inspect.getsource(func).encode())
+    digest.update(repr(args).encode())
+    for key in dep_keys:
+        digest.update(key.encode())
+    return digest.hexdigest()
+
+
+def _run_node(func, inputs, args):
+    return func(*inputs, *args)
+
+
+def execute_graph(graph, max_workers=None, cache_dir=CACHE_DIR, prune=True):
+    """
+    Run every node of the graph, in parallel where dependencies allow
+
+    Nodes whose cache key is already on disk are loaded instead of recomputed.
+    With `prune`, cache entries this graph did not use are deleted afterwards,
+    so the cache holds one set of results per extract instead of one per run.
+    Returns (results, stats) where stats counts computed and cached nodes.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    code_digest = _code_digest()
+    results, keys = {}, {}
+    stats = {'computed': 0, 'cached': 0}
+    pending = dict(graph)
+    running = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            progressed = True
+            while progressed:
+                progressed = False
+                ready = [node for node, (_, deps, _) in pending.items() if all(d in results for d in deps)]
+                for node in ready:
+                    func, deps, args = pending.pop(node)
+                    key = _node_key(node, func, [keys[d] for d in deps], args, code_digest)
+                    keys[node] = key
+                    cache_path = os.path.join(cache_dir, f'{key}.pkl')
+                    if node[1] not in UNCACHED_STAGES and os.path.exists(cache_path):
+                        with open(cache_path, 'rb') as f:
+                            results[node] = pickle.load(f)
+                        stats['cached'] += 1
+                        progressed = True
+                    else:
+                        inputs = [results[d] for d in deps]
+                        running[executor.submit(_run_node, func, inputs, args)] = node
+
+            if not running:
+                if pending:
+                    raise RuntimeError(f"Unresolvable stage dependencies: {sorted(pending)}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                results[node] = future.result()
+                stats['computed'] += 1
+                if node[1] in UNCACHED_STAGES:
+                    continue
+                cache_path = os.path.join(cache_dir, f'{keys[node]}.pkl')
+                tmp_path = f'{cache_path}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(results[node], f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+
+    if prune:
+        used = {f'{key}.pkl' for node, key in keys.items() if node[1] not in UNCACHED_STAGES}
+        for name in os.listdir(cache_dir):
+            if name.endswith('.pkl') and name not in used:
+                os.remove(os.path.join(cache_dir, name))
+
+    return results, stats
+
+
+def report_name(path):
+    """
+    Report file stem derived from the extract's path relative to the working directory
+
+    'diabetes.csv' -> 'diabetes', 'site_a/diabetes.csv' -> 'site_a_diabetes'
+    """
+    relative = os.path.splitext(os.path.relpath(os.path.abspath(path)))[0]
+    parts = [part for part in re.split(r'[\\/]+', relative) if part not in ('', '.', '..')]
+    return re.sub(r'[^\w.-]+', '_', '_'.join(parts))
+
+
+def build_reports(paths, output_dir='reports', max_workers=None, cache_dir=CACHE_DIR):
+    """Build an HTML report for each dataset extract and return the written file paths"""
+    names = {}
+    for path in paths:
+        name = report_name(path)
+        if name in names:
+            raise ValueError(f"Extracts {names[name]!r} and {path!r} would both write {name}_report.html")
+        names[name] = path
+
+    os.makedirs(output_dir, exist_ok=True)
+    results, stats = execute_graph(build_graph(paths), max_workers=max_workers, cache_dir=cache_dir)
+
+    written = []
+    for name, path in names.items():
+        report_path = os.path.join(output_dir, f'{name}_report.html')
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(results[(path, 'render')])
+        written.append(report_path)
+
+    print(f"✅ {len(written)} report(s) written to {output_dir}/ "
+          f"({stats['computed']} stages computed, {stats['cached']} cached)")
+    return written
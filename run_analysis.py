@@ -3,6 +3,7 @@ Healthcare Data Analysis - Quick Start Script
 Run this script to quickly start the analysis
 """
 
+import argparse
 import subprocess
 import sys
 import os
@@ -58,9 +59,10 @@ def show_menu():
     print("=" * 50)
     print("1. 📊 Run Jupyter Notebook Analysis")
     print("2. 🌐 Launch Streamlit Dashboard")
-    print("3. 🧪 Run Test Suite")
-    print("4. 📋 Show Project Info")
-    print("5. ❌ Exit")
+    print("3. 📄 Build HTML Reports")
+    print("4. 🧪 Run Test Suite")
+    print("5. 📋 Show Project Info")
+    print("6. ❌ Exit")
     print("=" * 50)
 
 def run_jupyter():
@@ -85,6 +87,22 @@ def run_streamlit():
     except Exception as e:
         print(f"❌ Error launching Streamlit: {e}")
 
+def run_reports(paths=None, output_dir='reports', workers=None):
+    """Build static HTML reports without Jupyter; returns True on success"""
+    print("\n📄 Building HTML reports...")
+    paths = paths or [d for d in ['diabetes.csv', 'heart_disease.csv'] if os.path.exists(d)]
+    if not paths:
+        print("❌ No datasets to report on")
+        return False
+    try:
+        from report_pipeline import build_reports
+        for report in build_reports(paths, output_dir=output_dir, max_workers=workers):
+            print(f"  • {report}")
+        return True
+    except Exception as e:
+        print(f"❌ Error building reports: {e}")
+        return False
+
 def run_tests():
     """Run test suite"""
     print("\n🧪 Running Test Suite...")
@@ -104,6 +122,8 @@ def show_info():
         ("app.py", "Streamlit dashboard"),
         ("healthcare_analysis.ipynb", "Jupyter notebook analysis"),
         ("download_data.py", "Data downloader script"),
+        ("report_pipeline.py", "Headless HTML report pipeline"),
+        ("load_test.py", "Dashboard load-test harness"),
         ("test_setup.py", "Test suite"),
         ("requirements.txt", "Python dependencies"),
         ("README.md", "Project documentation"),
@@ -151,21 +171,23 @@ def main():
         show_menu()
         
         try:
-            choice = input("\nEnter your choice (1-5): ").strip()
+            choice = input("\nEnter your choice (1-6): ").strip()
             
             if choice == '1':
                 run_jupyter()
             elif choice == '2':
                 run_streamlit()
             elif choice == '3':
-                run_tests()
+                run_reports()
             elif choice == '4':
-                show_info()
+                run_tests()
             elif choice == '5':
+                show_info()
+            elif choice == '6':
                 print("\n👋 Goodbye! Happy analyzing!")
                 break
             else:
-                print("❌ Invalid choice. Please enter 1-5.")
+                print("❌ Invalid choice. Please enter 1-6.")
                 
         except KeyboardInterrupt:
             print("\n\n👋 Goodbye! Happy analyzing!")
@@ -173,5 +195,19 @@ def main():
         except Exception as e:
             print(f"❌ Error: {e}")
 
+def parse_args():
+    """Parse command line options for headless runs"""
+    parser = argparse.ArgumentParser(description="Healthcare Data Analysis - Quick Start")
+    parser.add_argument('--report', nargs='*', metavar='CSV',
+                        help="build HTML reports for the given extracts (default: bundled datasets) and exit")
+    parser.add_argument('--output-dir', default='reports', help="directory for generated reports")
+    parser.add_argument('--workers', type=int, default=None, help="number of worker processes")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.report is not None:
+        # Non-zero exit status so scheduled report jobs can detect failures
+        sys.exit(0 if run_reports(args.report, output_dir=args.output_dir, workers=args.workers) else 1)
+    else:
+        main()
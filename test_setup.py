@@ -9,6 +9,9 @@ import seaborn as sns
 import streamlit as st
 import plotly.express as px
 from sklearn.ensemble import RandomForestClassifier
+import io
+import os
+import time
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -109,6 +112,436 @@ def test_streamlit_app():
         print(f"❌ Streamlit app error: {e}")
         return False
 
+def test_report_pipeline():
+    """Test the headless report pipeline and its stage cache"""
+    print("\n🧪 Testing report pipeline...")
+    
+    try:
+        import shutil
+        import tempfile
+        from report_pipeline import UNCACHED_STAGES, build_graph, execute_graph, build_reports
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, 'cache')
+            reports = build_reports(['diabetes.csv'], output_dir=tmp, cache_dir=cache_dir)
+            with open(reports[0], encoding='utf-8') as f:
+                content = f.read()
+            if 'Risk Factor Analysis' not in content or 'Outlier Detection' not in content or 'data:image/png;base64' not in content:
+                print("❌ Report is missing expected sections")
+                return False
+            print("✅ HTML report generated")
+            
+            # Unchanged inputs must be served entirely from the cache
+            _, stats = execute_graph(build_graph(['diabetes.csv']), cache_dir=cache_dir)
+            if stats['computed'] != len(UNCACHED_STAGES):
+                print(f"❌ {stats['computed']} stages recomputed with unchanged inputs")
+                return False
+            print("✅ Unchanged stages skipped via content hashes")
+            
+            # Changing the validation rules must invalidate cached stages
+            from data_validation import SCHEMAS
+            saved = SCHEMAS['diabetes']
+            SCHEMAS['diabetes'] = []
+            try:
+                _, stats = execute_graph(build_graph(['diabetes.csv']), cache_dir=cache_dir)
+            finally:
+                SCHEMAS['diabetes'] = saved
+            if stats['cached'] != 0:
+                print(f"❌ {stats['cached']} stages served from cache after a rule change")
+                return False
+            print("✅ Rule and helper changes invalidate the cache")
+            
+            # Same file name in different directories must not overwrite each other
+            for site in ['site_a', 'site_b']:
+                os.makedirs(os.path.join(tmp, site))
+                shutil.copy('diabetes.csv', os.path.join(tmp, site, 'diabetes.csv'))
+            paths = [os.path.join(tmp, site, 'diabetes.csv') for site in ['site_a', 'site_b']]
+            reports = build_reports(paths, output_dir=os.path.join(tmp, 'out'), cache_dir=cache_dir)
+            if len(set(reports)) != 2:
+                print("❌ Per-site reports overwrite each other")
+                return False
+            try:
+                build_reports([paths[0], paths[0]], output_dir=os.path.join(tmp, 'out'), cache_dir=cache_dir)
+                print("❌ Duplicate report names were not rejected")
+                return False
+            except ValueError:
+                pass
+            print("✅ Per-site report names are unique")
+            
+            # Only entries used by the latest graph are kept
+            _, stats = execute_graph(build_graph(['diabetes.csv']), cache_dir=cache_dir)
+            entries = [name for name in os.listdir(cache_dir) if name.endswith('.pkl')]
+            if len(entries) != stats['cached'] + stats['computed'] - len(UNCACHED_STAGES):
+                print(f"❌ Cache holds {len(entries)} entries after pruning")
+                return False
+            print("✅ Unused cache entries pruned")
+            
+            # Wide extracts keep the per-column charts to a readable size
+            from report_pipeline import stage_distributions
+            from wide_features import WIDE_FEATURE_THRESHOLD
+            rng = np.random.default_rng(0)
+            wide = pd.DataFrame(rng.normal(size=(200, 80)), columns=[f'lab_{i}' for i in range(80)])
+            wide['Outcome'] = rng.integers(0, 2, size=200)
+            distributions = stage_distributions({'df': wide})
+            if not distributions['note'] or f"{WIDE_FEATURE_THRESHOLD} features" not in distributions['note']:
+                print("❌ Wide distribution grid not capped")
+                return False
+            print("✅ Wide distribution grid capped")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Report pipeline error: {e}")
+        return False
+
+def test_wide_features():
+    """Test blocked correlations and top-k pair extraction"""
+    print("\n🧪 Testing wide-feature mode...")
+    
+    try:
+        from wide_features import blocked_corr, downsample_corr, top_k_pairs
+        
+        df = pd.read_csv('diabetes.csv')
+        corr = blocked_corr(df, block_rows=100)
+        if np.abs(corr.to_numpy() - df.corr().to_numpy()).max() > 1e-4:
+            print("❌ Blocked correlations differ from pandas")
+            return False
+        print("✅ Blocked float32 correlations match pandas")
+        
+        # Gaps must give pandas' pairwise-complete correlations, not values shrunk toward zero
+        gappy = df.mask(np.random.default_rng(0).random(df.shape) < 0.3)
+        if np.nanmax(np.abs(blocked_corr(gappy, block_rows=100).to_numpy() - gappy.corr().to_numpy())) > 1e-4:
+            print("❌ Blocked correlations with missing values differ from pandas")
+            return False
+        print("✅ Missing values handled pairwise")
+        
+        # Reference: the notebook's original double loop
+        expected = sorted(
+            ((corr.columns[i], corr.columns[j], abs(corr.iloc[i, j]))
+             for i in range(len(corr.columns)) for j in range(i + 1, len(corr.columns))),
+            key=lambda x: x[2], reverse=True
+        )[:10]
+        if [pair[:2] for pair in top_k_pairs(corr, k=10)] != [pair[:2] for pair in expected]:
+            print("❌ Top-k pairs differ from the double loop")
+            return False
+        print("✅ Top-k correlated pairs extracted")
+        
+        wide = pd.DataFrame(np.random.default_rng(0).normal(size=(200, 150)))
+        if downsample_corr(blocked_corr(wide), max_cells=40).shape != (40, 40):
+            print("❌ Heatmap downsampling failed")
+            return False
+        print("✅ Wide heatmap downsampled")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Wide-feature error: {e}")
+        return False
+
+def test_quantile_sketch():
+    """Test streaming quantile sketches against exact quantiles"""
+    print("\n🧪 Testing quantile sketches...")
+    
+    try:
+        from quantile_sketch import (KLLSketch, build_sketches, iqr_bounds,
+                                     merge_sketches, sketch_medians)
+        
+        # Exact mode reproduces pandas
+        df = pd.read_csv('diabetes.csv')
+        exact = build_sketches(df, exact=True)
+        if not np.allclose(sketch_medians(exact), df.median()):
+            print("❌ Exact medians differ from pandas")
+            return False
+        lower, _ = iqr_bounds(exact)
+        expected = df.quantile(0.25) - 1.5 * (df.quantile(0.75) - df.quantile(0.25))
+        if not np.allclose(lower, expected):
+            print("❌ Exact IQR bounds differ from pandas")
+            return False
+        print("✅ Exact mode matches pandas")
+        
+        # Approximate mode: sketches merged from several workers stay within the rank error bound
+        values = np.random.default_rng(7).lognormal(size=500_000)
+        chunks = [pd.DataFrame({'x': chunk}) for chunk in np.array_split(values, 50)]
+        parts = [build_sketches(chunks[i::4], seed=i) for i in range(4)]
+        first_n = parts[0]['x'].n
+        sketch = merge_sketches(parts)['x']
+        if parts[0]['x'].n != first_n:
+            print("❌ Merging modified an input sketch")
+            return False
+        sorted_values = np.sort(values)
+        qs = np.linspace(0.01, 0.99, 99)
+        ranks = np.searchsorted(sorted_values, sketch.quantiles(qs)) / len(values)
+        errors = np.abs(ranks - qs)
+        worst = errors.max()
+        # The bound holds per query with ~99% confidence, so allow a few misses
+        if np.mean(errors <= sketch.rank_error) < 0.95 or worst > 2 * sketch.rank_error:
+            print(f"❌ Rank error {worst:.4f} exceeds bound {sketch.rank_error:.4f}")
+            return False
+        if sketch.size > 3 * KLLSketch().k:
+            print(f"❌ Sketch retained {sketch.size} values")
+            return False
+        print(f"✅ Merged sketch max rank error {worst:.4f} (bound {sketch.rank_error:.4f})")
+        
+        # The default seed is fixed, so reruns impute the same medians
+        medians = [sketch_medians(build_sketches(chunks))['x'] for _ in range(2)]
+        if medians[0] != medians[1]:
+            print("❌ Sketch medians change between runs")
+            return False
+        print("✅ Sketch results are reproducible")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Quantile sketch error: {e}")
+        return False
+
+def test_approximate_mode():
+    """Test stratified sampling, confidence intervals and progressive refinement"""
+    print("\n🧪 Testing approximate mode...")
+    
+    try:
+        from approximate import (ProgressiveEstimate, approximate_summary, corr_with_ci, sample_sizes,
+                                 stratified_order, stratum_labels)
+        
+        df = pd.read_csv('diabetes.csv')
+        order = stratified_order(stratum_labels(df, 'Outcome', 'Age'))
+        prefix = df.iloc[order[:200]]
+        if abs(prefix['Outcome'].mean() - df['Outcome'].mean()) > 0.01:
+            print("❌ Sample prefix is not stratified by Outcome")
+            return False
+        print("✅ Every prefix is a stratified sample")
+        
+        summary = approximate_summary(prefix, len(df), 'Outcome')
+        low, high = summary['describe'].loc[['mean 95% CI low', 'mean 95% CI high'], 'Glucose']
+        if not low <= df['Glucose'].mean() <= high:
+            print("❌ Confidence interval misses the true mean")
+            return False
+        print("✅ Confidence interval covers the exact mean")
+
+        corr, low, high = corr_with_ci(df.select_dtypes(include=[np.number]), len(df))
+        if not (np.allclose(low, corr) and np.allclose(high, corr)):
+            print("❌ Correlation interval has width on the full population")
+            return False
+        print("✅ Correlation interval collapses on the full population")
+
+        estimate = ProgressiveEstimate(
+            lambda size: approximate_summary(df.iloc[order[:size]], len(df), 'Outcome'),
+            sample_sizes(len(df), base=100)
+        ).start()
+        while not estimate.done:
+            time.sleep(0.05)
+        size, final = estimate.latest()
+        if size != len(df) or not np.isclose(final['risk']['Glucose']['diff'],
+                                             df[df['Outcome'] == 1]['Glucose'].mean() - df[df['Outcome'] == 0]['Glucose'].mean()):
+            print("❌ Refinement did not converge to the exact answer")
+            return False
+        print("✅ Background refinement reaches the exact answer")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Approximate mode error: {e}")
+        return False
+
+def test_query_engine():
+    """Test the lazy query engine against eager pandas filtering"""
+    print("\n🧪 Testing lazy query engine...")
+    
+    try:
+        import tempfile
+        from query_engine import LazyDataset, build_parquet_cache, is_available
+        
+        if not is_available():
+            print("⚠️ DuckDB not installed - out-of-core mode disabled, skipping")
+            return True
+        
+        df = pd.read_csv('heart_disease.csv')
+        numerical_cols = df.select_dtypes(include=[np.number]).columns
+        df[numerical_cols] = df[numerical_cols].fillna(df[numerical_cols].median())
+        df = df.drop_duplicates()
+        filters = {'age_col': 'age', 'age_range': (40, 60), 'gender_col': 'sex', 'selected_genders': [1.0]}
+        expected = df[(df['age'] >= 40) & (df['age'] <= 60) & df['sex'].isin([1.0])]
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = LazyDataset(build_parquet_cache('heart_disease.csv', cache_dir=tmp))
+            
+            if dataset.count(filters) != len(expected):
+                print("❌ Pushed-down filters return a different row count")
+                return False
+            if not np.allclose(dataset.describe(filters, ['chol', 'thalach']), expected[['chol', 'thalach']].describe()):
+                print("❌ describe() differs from pandas")
+                return False
+            if not np.allclose(dataset.corr(filters, ['age', 'chol', 'target']), expected[['age', 'chol', 'target']].corr()):
+                print("❌ Correlations differ from pandas")
+                return False
+            if not np.allclose(dataset.corr_with(filters, ['age', 'chol'], 'target'), expected[['age', 'chol']].corrwith(expected['target'])):
+                print("❌ Correlations with the target differ from pandas")
+                return False
+            _, counts = dataset.histogram(filters, 'chol', bins=30)
+            if not np.array_equal(counts, np.histogram(expected['chol'], bins=30)[0]):
+                print("❌ Histogram differs from numpy")
+                return False
+            print("✅ Filtered aggregates match pandas")
+            
+            search = expected.astype(str).apply(lambda x: x.str.contains('233', case=False, na=False)).any(axis=1)
+            if len(dataset.fetch(filters, search_term='233')) != search.sum():
+                print("❌ Search returns different rows")
+                return False
+            print("✅ Search pushed down to the engine")
+
+            exported = pd.read_csv(io.BytesIO(dataset.export_csv(filters, limit=10)))
+            if len(exported) != 10:
+                print("❌ Export ignores the row limit")
+                return False
+            print("✅ Export capped at the row limit")
+
+            # Violations stored in the cache match the eager report for the same filters
+            from data_validation import SCHEMAS, mask_invalid, validate
+            raw = pd.read_csv('diabetes.csv')
+            report = validate(raw, SCHEMAS['diabetes'])
+            kept = mask_invalid(raw, report).drop_duplicates()
+            kept = kept[(raw.loc[kept.index, 'Age'] >= 30) & (raw.loc[kept.index, 'Age'] <= 50)]
+            dataset = LazyDataset(build_parquet_cache('diabetes.csv', 'diabetes', cache_dir=tmp))
+            lazy = dataset.validation_summary({'age_col': 'Age', 'age_range': (30, 50)}, SCHEMAS['diabetes'])
+            if not np.array_equal(lazy['Violations'], report.summary(kept.index.to_numpy())['Violations']):
+                print("❌ Out-of-core violation counts differ from the eager report")
+                return False
+            if '_violations' in dataset.columns:
+                print("❌ Violation bits exposed as a data column")
+                return False
+            print("✅ Violation counts available out-of-core")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Query engine error: {e}")
+        return False
+
+def test_data_validation():
+    """Test data-quality rules, chunked bitmaps and masking"""
+    print("\n🧪 Testing data validation...")
+    
+    try:
+        import tempfile
+        from data_validation import SCHEMAS, mask_invalid, validate, validate_csv
+        
+        df = pd.read_csv('diabetes.csv')
+        rules = SCHEMAS['diabetes']
+        report = validate(df, rules)
+        
+        zeros = (df['Glucose'] == 0).sum()
+        if report.counts['Glucose zero as missing'] != zeros:
+            print("❌ Zero-as-missing count differs from pandas")
+            return False
+        out_of_range = ((df['BloodPressure'] != 0) & ((df['BloodPressure'] < 30) | (df['BloodPressure'] > 150))).sum()
+        if report.counts['BloodPressure in [30, 150]'] != out_of_range:
+            print("❌ Range rule count differs from pandas")
+            return False
+        print(f"✅ {report.total_violations} violations found across {len(rules)} rules")
+        
+        # Chunk boundaries that are not byte aligned must not shift any bits
+        chunked = validate(df, rules, chunksize=101)
+        with tempfile.TemporaryDirectory() as tmp:
+            spilled = validate_csv('diabetes.csv', rules, memory_budget=1, bitmap_dir=tmp)
+            for rule in rules:
+                expected = report.bitmap(rule.name)
+                if not (np.array_equal(chunked.bitmap(rule.name), expected)
+                        and np.array_equal(spilled.bitmap(rule.name), expected)):
+                    print(f"❌ Chunked bitmap differs for rule: {rule.name}")
+                    return False
+        print("✅ Chunked and on-disk bitmaps match a single pass")
+        
+        # validate_csv spills to a temporary directory by default; counts-only keeps no bitmaps
+        default = validate_csv('diabetes.csv', rules)
+        counts_only = validate_csv('diabetes.csv', rules, bitmaps=False)
+        if (default.bitmap_dir is None or not os.path.isdir(default.bitmap_dir)
+                or counts_only.counts != report.counts or counts_only.bitmap_dir is not None):
+            print("❌ Default spill or counts-only mode misbehaves")
+            return False
+        try:
+            counts_only.bitmap(rules[0].name)
+            print("❌ Counts-only report returned a bitmap")
+            return False
+        except ValueError:
+            pass
+        print("✅ Bitmaps spill to disk by default; counts-only mode keeps none")
+        
+        masked = mask_invalid(df, report)
+        if masked['Glucose'].isnull().sum() != report.invalid_mask('Glucose').sum() or (masked['BMI'] == 0).any():
+            print("❌ Flagged values were not replaced with NaN")
+            return False
+        subset = df.index[df['Outcome'] == 1].to_numpy()
+        if report.counts_for_rows(subset)['Glucose zero as missing'] != (df.loc[subset, 'Glucose'] == 0).sum():
+            print("❌ Per-row-subset counts differ from pandas")
+            return False
+        print("✅ Flagged values masked as missing")
+        
+        # Invalid outcome labels drop the row rather than being imputed
+        bad_label = df.copy()
+        bad_label.loc[3, 'Outcome'] = 2
+        cleaned = mask_invalid(bad_label, validate(bad_label, rules))
+        if 3 in cleaned.index or len(cleaned) != len(df) - 1 or cleaned['Outcome'].isnull().any():
+            print("❌ Row with an invalid outcome label was not dropped")
+            return False
+        print("✅ Invalid outcome labels dropped, not imputed")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Data validation error: {e}")
+        return False
+
+def test_load_test():
+    """Test the load-test harness against a minimal Streamlit script"""
+    print("\n🧪 Testing load-test harness...")
+    
+    try:
+        import tempfile
+        from load_test import run_load_test
+        
+        # Every rerun records the PID of the process serving it
+        script = (
+            "import os\n"
+            "import streamlit as st\n"
+            "with open(os.path.join(os.path.dirname(__file__), 'pids.txt'), 'a') as f:\n"
+            "    f.write(f'{os.getpid()}\\n')\n"
+            "age_range = st.sidebar.slider('Select Age range', 0, 100, (0, 100))\n"
+            "term = st.text_input('Search in data:', '')\n"
+            "st.write(age_range, term)\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'mini_app.py')
+            with open(path, 'w') as f:
+                f.write(script)
+            results = run_load_test(path, sessions=3, steps=4, timeout=30)
+            with open(os.path.join(tmp, 'pids.txt')) as f:
+                pids = set(f.read().split())
+        
+        if results['errors'] or results['reruns'] != 3 * (1 + 4):
+            print(f"❌ Expected 15 reruns, got {results['reruns']} ({results['errors']} errors)")
+            return False
+        if set(results['latency'].index) != {'initial_load', 'age_slider', 'search', 'all'}:
+            print("❌ Unexpected actions in latency table")
+            return False
+        if len(pids) != 1:
+            print(f"❌ Sessions served by {len(pids)} processes instead of one server")
+            return False
+        if not (results['throughput'] > 0 and results['rss_peak_mb'] >= results['rss_idle_mb'] > 0):
+            print("❌ Missing throughput or server RSS measurements")
+            return False
+        print(f"✅ {results['reruns']} reruns from one server at {results['throughput']:.1f}/s, "
+              f"p95 {results['latency'].loc['all', 'p95']:.0f} ms")
+        
+        # An exception shown on the page counts as a failed rerun
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'crashing_app.py')
+            with open(path, 'w') as f:
+                f.write("import streamlit as st\nst.write('loading')\n1 / 0\n")
+            results = run_load_test(path, sessions=2, steps=2, timeout=30)
+        if results['errors'] != 2 or results['reruns'] != 0:
+            print(f"❌ Crashed reruns not reported as errors ({results['errors']} errors)")
+            return False
+        print("✅ Crashed reruns reported as errors")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Load test error: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("🏥 Healthcare Analysis Setup Test")
@@ -118,7 +551,14 @@ def main():
         ("Library Imports", test_imports),
         ("Data Loading", test_data_loading),
         ("Basic Analysis", test_basic_analysis),
-        ("Streamlit App", test_streamlit_app)
+        ("Streamlit App", test_streamlit_app),
+        ("Report Pipeline", test_report_pipeline),
+        ("Wide Features", test_wide_features),
+        ("Quantile Sketches", test_quantile_sketch),
+        ("Approximate Mode", test_approximate_mode),
+        ("Query Engine", test_query_engine),
+        ("Data Validation", test_data_validation),
+        ("Load Test", test_load_test)
     ]
     
     results = []
@@ -0,0 +1,157 @@
+"""
+Healthcare Data Analysis - Wide Feature Mode
+Correlation helpers for extracts with hundreds of numerical columns
+"""
+
+import numpy as np
+import pandas as pd
+
+# Number of numerical columns above which the dashboard switches to wide mode
+WIDE_FEATURE_THRESHOLD = 30
+
+
+def blocked_corr(df, block_rows=65536, dtype=np.float32):
+    """
+    Pearson correlation matrix computed as blocked matrix products
+
+    Each row block is converted from `df` on its own, so peak memory is one
+    block of rows plus a few p x p accumulators. A first pass finds column
+    means and scales; the second accumulates, with M the non-missing mask and
+    X the standardized values (0 where missing), the pairwise sums X^T X,
+    X^T M, (X^2)^T M and M^T M. Like pandas, each pair therefore uses the
+    rows where both columns are present. Block products run in `dtype`
+    (float32 by default) and are accumulated in float64.
+    """
+    n_rows, n_cols = df.shape
+
+    def blocks():
+        for start in range(0, n_rows, block_rows):
+            yield df.iloc[start:start + block_rows].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    # Pass 1: mean and scale per column (only used to condition the products)
+    count = np.zeros(n_cols)
+    total = np.zeros(n_cols)
+    total_sq = np.zeros(n_cols)
+    for values in blocks():
+        present = ~np.isnan(values)
+        values = np.where(present, values, 0.0)
+        count += present.sum(axis=0)
+        total += values.sum(axis=0)
+        total_sq += (values ** 2).sum(axis=0)
+    mean = total / np.maximum(count, 1)
+    scale = np.sqrt(np.maximum(total_sq / np.maximum(count, 1) - mean ** 2, 0))
+    scale[~(scale > 0)] = 1.0
+
+    # Pass 2: pairwise-complete sums; entry [i, j] is over rows where both i and j are present
+    xy = np.zeros((n_cols, n_cols))
+    x_sum = np.zeros((n_cols, n_cols))
+    x_sq = np.zeros((n_cols, n_cols))
+    pairs = np.zeros((n_cols, n_cols))
+    for values in blocks():
+        block = ((values - mean) / scale).astype(dtype)
+        missing = np.isnan(block)
+        block[missing] = 0
+        xy += block.T @ block
+        if missing.any():
+            mask = (~missing).astype(dtype)
+            x_sum += block.T @ mask
+            x_sq += (block * block).T @ mask
+            pairs += mask.T @ mask
+        else:
+            x_sum += block.sum(axis=0, dtype=np.float64)[:, None]
+            x_sq += (block * block).sum(axis=0, dtype=np.float64)[:, None]
+            pairs += len(block)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = xy - x_sum * x_sum.T / pairs
+        var = x_sq - x_sum ** 2 / pairs
+        corr = cov / np.sqrt(var * var.T)
+    # Pairs with fewer than two common rows, or a constant column, are undefined
+    corr[(pairs < 2) | ~(var > 1e-12 * np.maximum(pairs, 1)) | ~(var.T > 1e-12 * np.maximum(pairs, 1))] = np.nan
+    np.clip(corr, -1, 1, out=corr)
+    diagonal = np.diag(corr).copy()
+    np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+    return pd.DataFrame(corr.astype(dtype), index=df.columns, columns=df.columns)
+
+
+def top_k_pairs(corr_matrix, k=10):
+    """
+    Return the k most strongly correlated column pairs as (col1, col2, |corr|)
+
+    Uses the upper triangle only and np.argpartition, so only the selected
+    k pairs are sorted.
+    """
+    columns = corr_matrix.columns
+    rows, cols = np.triu_indices(len(columns), k=1)
+    strengths = np.abs(corr_matrix.to_numpy()[rows, cols])
+    strengths = np.nan_to_num(strengths, nan=-1.0)
+    k = min(k, len(strengths))
+    if k == 0:
+        return []
+
+    top = np.argpartition(-strengths, k - 1)[:k]
+    top = top[np.argsort(-strengths[top], kind='stable')]
+    return [(columns[rows[i]], columns[cols[i]], float(strengths[i])) for i in top if strengths[i] >= 0]
+
+
+def cluster_order(corr_matrix):
+    """Column order that places mutually correlated features next to each other"""
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+
+    n_cols = len(corr_matrix.columns)
+    if n_cols < 3:
+        return np.arange(n_cols)
+
+    distance = 1 - np.abs(np.nan_to_num(corr_matrix.to_numpy(dtype=np.float64), nan=0.0))
+    distance = (distance + distance.T) / 2
+    np.fill_diagonal(distance, 0)
+    return leaves_list(linkage(squareform(distance, checks=False), method='average'))
+
+
+def downsample_corr(corr_matrix, max_cells=60):
+    """
+    Average a (clustered) correlation matrix into at most max_cells x max_cells blocks
+
+    Returns the reduced DataFrame; block labels name the first and last column
+    of each block.
+    """
+    n_cols = len(corr_matrix.columns)
+    if n_cols <= max_cells:
+        return corr_matrix
+
+    edges = np.linspace(0, n_cols, max_cells + 1).astype(int)
+    values = np.nan_to_num(corr_matrix.to_numpy(dtype=np.float64), nan=0.0)
+    # Block sums along both axes, then divide by the block areas
+    summed = np.add.reduceat(np.add.reduceat(values, edges[:-1], axis=0), edges[:-1], axis=1)
+    sizes = np.diff(edges)
+    reduced = summed / np.outer(sizes, sizes)
+
+    columns = corr_matrix.columns
+    labels = [columns[a] if b - a == 1 else f'{columns[a]}…{columns[b - 1]}'
+              for a, b in zip(edges[:-1], edges[1:])]
+    return pd.DataFrame(reduced, index=labels, columns=labels)
+
+
+def plot_wide_heatmap(corr_matrix, ax, max_cells=60, annot_threshold=20):
+    """
+    Draw a clustered, downsampled correlation heatmap on `ax`
+
+    At most max_cells x max_cells blocks are drawn and cell annotations are
+    only added when the drawn matrix has annot_threshold rows or fewer.
+    """
+    import seaborn as sns
+
+    order = cluster_order(corr_matrix)
+    clustered = corr_matrix.iloc[order, order]
+    drawn = downsample_corr(clustered, max_cells=max_cells)
+    annotate = len(drawn) <= annot_threshold
+
+    sns.heatmap(drawn, annot=annotate, fmt='.2f', cmap='coolwarm', center=0, vmin=-1, vmax=1,
+                square=True, ax=ax, xticklabels=annotate or 'auto', yticklabels=annotate or 'auto')
+    if len(drawn) < len(corr_matrix):
+        ax.set_title(f'Clustered Correlation Matrix ({len(corr_matrix)} features, '
+                     f'{len(drawn)}x{len(drawn)} block averages)')
+    else:
+        ax.set_title(f'Clustered Correlation Matrix ({len(corr_matrix)} features)')
+    return drawn